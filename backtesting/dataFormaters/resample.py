@@ -16,6 +16,9 @@ def resample(df, freq='5T'):
 
     df['datetime'] = pd.to_datetime(df['datetime'])
     df.set_index('datetime', inplace=True)
+    # resample takes its fast binning path on a sorted index; ClickHouse normally returns one
+    if not df.index.is_monotonic_increasing:
+        df.sort_index(inplace=True)
     df = df.resample(frequency).agg({'open': 'first',
                                         'high': 'max', 
                                         'low': 'min', 
@@ -0,0 +1,234 @@
+"""
+Compiled numeric kernels for the Ichimoku-ADX backtester
+Numba is optional - without it scan_trade and pnl_stats fall back to vectorized NumPy versions
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback decorator used when numba is not installed"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Exit codes returned by scan_trade
+EXIT_TIMEOUT = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+
+
+@njit(cache=True, nogil=True)
+def scan_trade(close, entry_price, direction, stop_loss_price, take_profit_price, quantity):
+    """
+    Walk the minute closes of one trade until stop loss or take profit is hit
+    direction: 1 for buy, -1 for sell
+
+    Returns (held_minutes, exit_code, max_profit, max_loss,
+             profitable_minutes, profit_start_minute, loss_start_minute)
+    """
+    max_profit = 0.0
+    max_loss = 0.0
+    profitable_minutes = 0
+    profit_start = 0
+    loss_start = 0
+
+    for i in range(close.shape[0]):
+        price = close[i]
+
+        # Check stop loss and take profit before tracking the minute
+        if direction == 1:
+            if price <= stop_loss_price:
+                return i, EXIT_STOP_LOSS, max_profit, max_loss, profitable_minutes, profit_start, loss_start
+            if price >= take_profit_price:
+                return i, EXIT_TAKE_PROFIT, max_profit, max_loss, profitable_minutes, profit_start, loss_start
+            gross_pnl = (price - entry_price) * quantity
+        else:
+            if price >= stop_loss_price:
+                return i, EXIT_STOP_LOSS, max_profit, max_loss, profitable_minutes, profit_start, loss_start
+            if price <= take_profit_price:
+                return i, EXIT_TAKE_PROFIT, max_profit, max_loss, profitable_minutes, profit_start, loss_start
+            gross_pnl = (entry_price - price) * quantity
+
+        # Track profitability
+        if gross_pnl > 0:
+            if gross_pnl > max_profit:
+                max_profit = gross_pnl
+            profitable_minutes += 1
+            if profit_start == 0:
+                profit_start = i + 1
+        else:
+            if gross_pnl < max_loss:
+                max_loss = gross_pnl
+            if loss_start == 0:
+                loss_start = i + 1
+
+    return close.shape[0], EXIT_TIMEOUT, max_profit, max_loss, profitable_minutes, profit_start, loss_start
+
+
+@njit(cache=True, parallel=True)
+def scan_trades(close, starts, ends, entry_prices, directions, stop_loss_prices, take_profit_prices, quantity):
+    """
+    Run scan_trade for a batch of trades in parallel
+    Trade j covers close[starts[j]:ends[j]]; returns one array per scan_trade output
+    """
+    n = starts.shape[0]
+    held_minutes = np.empty(n, dtype=np.int64)
+    exit_codes = np.empty(n, dtype=np.int64)
+    max_profits = np.empty(n, dtype=np.float64)
+    max_losses = np.empty(n, dtype=np.float64)
+    profitable_minutes = np.empty(n, dtype=np.int64)
+    profit_starts = np.empty(n, dtype=np.int64)
+    loss_starts = np.empty(n, dtype=np.int64)
+
+    for j in prange(n):
+        result = scan_trade(close[starts[j]:ends[j]], entry_prices[j], directions[j],
+                            stop_loss_prices[j], take_profit_prices[j], quantity)
+        held_minutes[j] = result[0]
+        exit_codes[j] = result[1]
+        max_profits[j] = result[2]
+        max_losses[j] = result[3]
+        profitable_minutes[j] = result[4]
+        profit_starts[j] = result[5]
+        loss_starts[j] = result[6]
+
+    return held_minutes, exit_codes, max_profits, max_losses, profitable_minutes, profit_starts, loss_starts
+
+
+@njit(cache=True, nogil=True)
+def pnl_stats(net_pnl):
+    """
+    Reductions of a time-ordered per-trade net P&L array in a single pass
+    Standard deviations are population (ddof=0), updated with Welford's method;
+    the downside deviation covers losing trades and is 0 with fewer than two of them
+
+    Returns (total, mean, std, best, worst, max_drawdown, profitable_count,
+             gross_profit, gross_loss, avg_profit, avg_loss, downside_std)
+    avg_loss averages every non-profitable trade, gross_loss sums the losing ones as a positive amount
+    """
+    n = net_pnl.shape[0]
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+    total = 0.0
+    mean = 0.0
+    m2 = 0.0
+    best = net_pnl[0]
+    worst = net_pnl[0]
+    peak = net_pnl[0]
+    worst_drawdown = 0.0
+    profitable = 0
+    gross_profit = 0.0
+    non_profit_total = 0.0
+    losing = 0
+    gross_loss = 0.0
+    loss_mean = 0.0
+    loss_m2 = 0.0
+
+    for i in range(n):
+        value = net_pnl[i]
+        total += value
+
+        delta = value - mean
+        mean += delta / (i + 1)
+        m2 += delta * (value - mean)
+
+        if value > best:
+            best = value
+        if value < worst:
+            worst = value
+
+        # Running peak of the cumulative P&L
+        if total > peak:
+            peak = total
+        if total - peak < worst_drawdown:
+            worst_drawdown = total - peak
+
+        if value > 0:
+            profitable += 1
+            gross_profit += value
+        else:
+            non_profit_total += value
+            if value < 0:
+                losing += 1
+                gross_loss -= value
+                loss_delta = value - loss_mean
+                loss_mean += loss_delta / losing
+                loss_m2 += loss_delta * (value - loss_mean)
+
+    avg_profit = gross_profit / profitable if profitable > 0 else 0.0
+    avg_loss = non_profit_total / (n - profitable) if profitable < n else 0.0
+    downside_std = np.sqrt(loss_m2 / losing) if losing > 1 else 0.0
+    return (total, total / n, np.sqrt(m2 / n), best, worst, worst_drawdown, profitable,
+            gross_profit, gross_loss, avg_profit, avg_loss, downside_std)
+
+
+def scan_trade_numpy(close, entry_price, direction, stop_loss_price, take_profit_price, quantity):
+    """
+    Vectorized equivalent of scan_trade for installs without numba
+    Finds the first breach with argmax on boolean masks instead of a per-minute loop
+    """
+    if direction == 1:
+        stop_hit = close <= stop_loss_price
+        target_hit = close >= take_profit_price
+    else:
+        stop_hit = close >= stop_loss_price
+        target_hit = close <= take_profit_price
+
+    breach = stop_hit | target_hit
+    if breach.any():
+        held_minutes = int(breach.argmax())
+        exit_code = EXIT_STOP_LOSS if stop_hit[held_minutes] else EXIT_TAKE_PROFIT
+    else:
+        held_minutes = close.shape[0]
+        exit_code = EXIT_TIMEOUT
+
+    held_close = close[:held_minutes]
+    if direction == 1:
+        gross_pnl = (held_close - entry_price) * quantity
+    else:
+        gross_pnl = (entry_price - held_close) * quantity
+
+    profitable = gross_pnl > 0
+    profitable_minutes = int(np.count_nonzero(profitable))
+    profit_start = int(profitable.argmax()) + 1 if profitable_minutes > 0 else 0
+    loss_start = int((~profitable).argmax()) + 1 if profitable_minutes < held_minutes else 0
+
+    return (held_minutes, exit_code, float(gross_pnl.max(initial=0.0)), float(gross_pnl.min(initial=0.0)),
+            profitable_minutes, profit_start, loss_start)
+
+
+def _max_drawdown_numpy(cumulative_pnl):
+    """Largest peak-to-trough decline of a cumulative P&L curve (0 or negative), used by pnl_stats_numpy"""
+    if cumulative_pnl.shape[0] == 0:
+        return 0.0
+    return float((cumulative_pnl - np.maximum.accumulate(cumulative_pnl)).min())
+
+
+def pnl_stats_numpy(net_pnl):
+    """Vectorized equivalent of pnl_stats for installs without numba"""
+    n = net_pnl.shape[0]
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0
+    profit_mask = net_pnl > 0
+    profit = net_pnl[profit_mask]
+    non_profit = net_pnl[~profit_mask]
+    losses = net_pnl[net_pnl < 0]
+    return (float(net_pnl.sum()), float(net_pnl.mean()), float(net_pnl.std()),
+            float(net_pnl.max()), float(net_pnl.min()), _max_drawdown_numpy(np.cumsum(net_pnl)),
+            int(profit.shape[0]), float(profit.sum()), float(-losses.sum()),
+            float(profit.mean()) if profit.shape[0] else 0.0,
+            float(non_profit.mean()) if non_profit.shape[0] else 0.0,
+            float(losses.std()) if losses.shape[0] > 1 else 0.0)
+
+
+if not NUMBA_AVAILABLE:
+    scan_trade = scan_trade_numpy
+    pnl_stats = pnl_stats_numpy
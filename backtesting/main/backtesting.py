@@ -14,12 +14,35 @@ from dotenv import load_dotenv
 import warnings
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import seaborn as sns
-from io import StringIO
 import json
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
+from clickhouse_connect.driver.external import ExternalData
+from _kernels import scan_trade, scan_trades, pnl_stats, EXIT_TIMEOUT, EXIT_STOP_LOSS
 # Import user configuration
 from config_backtesting import *
 
+# Settings added after older configs were written fall back to their shipped defaults
+for _name, _default in {
+    'QUANTITY': 1,
+    'MAX_WORKERS': 4,
+    'RESULTS_FORMAT': "csv",
+    'SAVE_MINUTE_DETAIL': False,
+    'SCAN_IN_CLICKHOUSE': False,
+    'EQUITY_CURVE_DPI': 150,
+}.items():
+    globals().setdefault(_name, _default)
+
+# pyarrow is optional - it writes the result tables in C++ (CSV) and enables Parquet output
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = pa_csv = pa_parquet = None
+
 warnings.filterwarnings('ignore')
 
 # Set matplotlib backend for server environments
@@ -29,6 +52,193 @@ sns.set_palette("husl")
 # Load environment variables
 load_dotenv()
 
+# Layout of the per-minute records kept for every trade
+MINUTE_RECORD_DTYPE = np.dtype([
+    ('minute', np.int32),
+    ('timestamp', 'datetime64[ns]'),
+    ('price', np.float64),
+    ('gross_pnl', np.float64),
+    ('net_pnl', np.float64),
+    ('pnl_pct', np.float64),
+    ('cumulative_profit_minutes', np.int32),
+    ('cumulative_loss_minutes', np.int32)
+])
+
+# Numeric fields of every trade a pattern takes, kept column-wise for the statistics
+TRADE_RECORD_DTYPE = np.dtype([
+    ('signal_time', 'datetime64[ns]'),
+    ('direction', np.int8),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('gross_pnl', np.float64),
+    ('net_pnl', np.float64),
+    ('transaction_costs', np.float64),
+    ('max_profit', np.float64),
+    ('max_loss', np.float64),
+    ('profitable_minutes', np.int32),
+    ('loss_minutes', np.int32),
+    ('held_minutes', np.int32)
+])
+
+# Trade record fields written to the pattern PnL tables, mapped to their column names
+PNL_TRADE_COLUMNS = {
+    'signal_time': 'signal_time',
+    'adjusted_signal_time': 'position_entry_time',
+    'signal_type': 'signal_type',
+    'entry_price': 'buy_price',
+    'exit_price': 'sell_price',
+    'quantity': 'quantity',
+    'gross_pnl': 'gross_pnl',
+    'net_pnl': 'net_pnl',
+    'transaction_costs': 'transaction_costs',
+    'exit_reason': 'exit_reason',
+    'total_minutes_analyzed': 'holding_minutes'
+}
+
+# Decimal places of the pattern metrics columns, applied to the whole table at once
+PATTERN_METRICS_ROUNDING = {
+    'win_rate_pct': 2,
+    'total_gross_pnl': 2,
+    'total_net_pnl': 2,
+    'avg_trade_pnl': 2,
+    'best_trade_pnl': 2,
+    'worst_trade_pnl': 2,
+    'avg_profit_pnl': 2,
+    'avg_loss_pnl': 2,
+    'total_return_pct': 4,
+    'avg_trade_return_pct': 4,
+    'best_trade_return_pct': 4,
+    'worst_trade_return_pct': 4,
+    'avg_profit_return_pct': 4,
+    'avg_loss_return_pct': 4,
+    'annualized_return_pct': 2,
+    'volatility_pct': 4,
+    'max_drawdown_pnl': 2,
+    'max_drawdown_pct': 4,
+    'sharpe_ratio': 4,
+    'sortino_ratio': 4,
+    'calmar_ratio': 4,
+    'profit_factor': 2,
+    'recovery_factor': 2,
+    'trades_per_month': 2,
+    'avg_holding_minutes': 1,
+    'performance_score': 2
+}
+
+# Key metrics kept in pattern_summary_metrics.csv
+PATTERN_SUMMARY_COLUMNS = [
+    'pattern_id', 'pattern_name', 'total_trades', 'skipped_signals', 'win_rate_pct',
+    'total_net_pnl', 'total_return_pct', 'max_drawdown_pct',
+    'sharpe_ratio', 'profit_factor', 'performance_score'
+]
+
+# Overall financial metrics written to overall_metrics.csv, in file order, with their descriptions
+OVERALL_METRIC_DESCRIPTIONS = {
+    'total_trades': 'Total number of trades executed',
+    'profitable_trades': 'Number of profitable trades',
+    'win_rate': 'Percentage of profitable trades',
+    'total_pnl': 'Total profit and loss amount',
+    'avg_trade': 'Average profit/loss per trade',
+    'max_trade': 'Best single trade result',
+    'min_trade': 'Worst single trade result',
+    'std_returns': 'Standard deviation of returns',
+    'sharpe_ratio': 'Risk-adjusted return measure',
+    'max_drawdown': 'Largest peak-to-trough decline',
+    'max_drawdown_pct': 'Maximum drawdown as percentage',
+    'profit_factor': 'Gross profit / Gross loss',
+    'recovery_factor': 'Total P&L / Maximum drawdown',
+    'sortino_ratio': 'Downside risk-adjusted return'
+}
+
+
+def read_signals_csv(csv_path: str, dtypes: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Read a signals CSV with 'datetime' parsed and the given column dtypes
+    With pyarrow the CSV is parsed in C++ and cached as a Parquet sidecar
+    (csv_path + '.parquet'), which later reads use while it is newer than the CSV;
+    the sidecar keeps the CSV's inferred types and every read casts to the requested dtypes
+    Remaining string columns (e.g. closest_expiry, a handful of repeated values) become categoricals
+    """
+    if pa_csv is None:
+        signals_df = pd.read_csv(csv_path, dtype=dtypes)
+        # Nanosecond resolution, like the timestamp[ns] column of the pyarrow reader
+        signals_df['datetime'] = pd.to_datetime(signals_df['datetime']).astype('datetime64[ns]')
+    else:
+        parquet_path = csv_path + '.parquet'
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            table = pa_parquet.read_table(parquet_path)
+        else:
+            # Empty fields of text columns are missing values, as pd.read_csv reads them
+            convert_options = pa_csv.ConvertOptions(column_types={'datetime': pa.timestamp('ns')},
+                                                    strings_can_be_null=True)
+            table = pa_csv.read_csv(csv_path, convert_options=convert_options)
+            # Date columns stay text and all-empty columns float, as pd.read_csv leaves them
+            table = table.cast(pa.schema([
+                field.with_type(pa.string()) if pa.types.is_date(field.type)
+                else field.with_type(pa.float64()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ]))
+            # Written under a temporary name and renamed, so a concurrent reader never sees a partial file
+            temp_path = f"{parquet_path}.{os.getpid()}.tmp"
+            try:
+                pa_parquet.write_table(table, temp_path, compression='snappy')
+                os.replace(temp_path, parquet_path)
+            except OSError:
+                # Read-only data directory; parse the CSV again next time
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        column_types = {name: pa.from_numpy_dtype(dtype) for name, dtype in dtypes.items()}
+        table = table.cast(pa.schema([
+            field.with_type(column_types[field.name]) if field.name in column_types else field
+            for field in table.schema
+        ]))
+        signals_df = table.to_pandas()
+
+    object_cols = [name for name in signals_df.select_dtypes(include='object').columns
+                   if pd.api.types.infer_dtype(signals_df[name], skipna=True) == 'string']
+    if object_cols:
+        signals_df[object_cols] = signals_df[object_cols].astype('category')
+    return signals_df
+
+
+def write_csv(df: pd.DataFrame, path: str):
+    """Write a DataFrame as CSV through pyarrow's multithreaded writer, falling back to to_csv"""
+    if pa_csv is None:
+        df.to_csv(path, index=False)
+        return
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Timestamps are written at second precision, as to_csv does for minute data;
+        # the cast keeps the time zone and refuses to drop sub-second parts
+        table = table.cast(pa.schema([
+            field.with_type(pa.timestamp('s', tz=field.type.tz)) if pa.types.is_timestamp(field.type) else field
+            for field in table.schema
+        ]))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns (e.g. 'N/A' next to numbers) have no Arrow type, and
+        # sub-second timestamps cannot be cast to seconds; to_csv writes both as they are
+        df.to_csv(path, index=False)
+        return
+    pa_csv.write_csv(table, path)
+
+
+@lru_cache(maxsize=None)
+def get_clickhouse_client(host: str, port: int, username: str, password: str):
+    """
+    Shared ClickHouse client per server and user
+    clickhouse_connect pools its HTTP connections with TCP keepalive, so reusing
+    the client skips the handshake on every fetch
+    """
+    return clickhouse_connect.get_client(
+        host=host,
+        port=port,
+        username=username,
+        password=password,
+        compress='lz4',  # Minute bars compress well and the fetch is network bound
+        connect_timeout=10,
+        send_receive_timeout=600,
+        autogenerate_session_id=False  # A session id would serialize concurrent queries
+    )
 
 
 class IchimokuADXBacktester:
@@ -47,7 +257,7 @@ class IchimokuADXBacktester:
         self.SYMBOL = SYMBOL
         self.INITIAL_CAPITAL = INITIAL_CAPITAL
         self.POSITION_SIZE = POSITION_SIZE
-        self.QUANTITY = getattr(globals(), 'QUANTITY', 1) # Default to 1 if not defined
+        self.QUANTITY = int(QUANTITY)
         self.TRANSACTION_COST = TRANSACTION_COST
         self.MIN_HOLDING_MINUTES = MIN_HOLDING_MINUTES
         self.MAX_HOLDING_MINUTES = MAX_HOLDING_MINUTES
@@ -55,6 +265,16 @@ class IchimokuADXBacktester:
         self.TAKE_PROFIT_PCT = TAKE_PROFIT_PCT
         self.OUTPUT_DIR = OUTPUT_DIR
         self.BACKTEST_NAME = BACKTEST_NAME
+        self.RESULTS_FORMAT = RESULTS_FORMAT
+        self.EQUITY_CURVE_DPI = EQUITY_CURVE_DPI
+        self.MAX_WORKERS = MAX_WORKERS
+        self.SAVE_MINUTE_DETAIL = SAVE_MINUTE_DETAIL
+        self.SCAN_IN_CLICKHOUSE = SCAN_IN_CLICKHOUSE
+        
+        # Timeframe offset and exit level multipliers, resolved once instead of per signal
+        self._signal_offset = self._signal_delay()
+        self._stop_loss_mult = {1: 1 - self.STOP_LOSS_PCT, -1: 1 + self.STOP_LOSS_PCT}
+        self._take_profit_mult = {1: 1 + self.TAKE_PROFIT_PCT, -1: 1 - self.TAKE_PROFIT_PCT}
         
         # Pattern names for analysis
         self.PATTERN_NAMES = {
@@ -70,12 +290,32 @@ class IchimokuADXBacktester:
             9: "Additional Pattern"
         }
         
+        # File-name forms of the pattern names, built once (keeps the existing result file names)
+        self._pattern_slugs = {
+            pattern_id: name.replace(' ', '_').replace('/', '_') for pattern_id, name in self.PATTERN_NAMES.items()
+        }
+        
         # Initialize ClickHouse client
         self.client = self._init_clickhouse()
         
         # Results storage
         self.results = {}
         self.detailed_trades = []
+        self._trades_df = None
+        self._pattern_metrics_cache = {}
+        self._financial_metrics_cache = {}
+        self._dashboard_figure = None
+        
+        # Minute bars covering the whole backtest, filled by load_minute_cache
+        self._minute_cache = None
+        self._minute_times = None
+        self._minute_close = None
+        
+        # Signal row positions per pattern, filled by index_pattern_signals
+        self._pattern_rows = {}
+        
+        # Batched exit scans per pattern, filled by scan_pattern_signals(_clickhouse)
+        self._pattern_scans = {}
         
     def _init_clickhouse(self):
         """Initialize ClickHouse connection"""
@@ -85,12 +325,7 @@ class IchimokuADXBacktester:
             username = os.getenv('CLICKHOUSE_USER', 'default')
             password = os.getenv('CLICKHOUSE_PASSWORD', '')
             
-            client = clickhouse_connect.get_client(
-                host=host,
-                port=port,
-                username=username,
-                password=password
-            )
+            client = get_clickhouse_client(host, port, username, password)
             
             print(f"✅ Connected to ClickHouse at {host}:{port}")
             return client
@@ -99,16 +334,27 @@ class IchimokuADXBacktester:
             print(f"❌ ClickHouse connection failed: {e}")
             raise
     
-    def load_signals(self) -> pd.DataFrame:
-        """Load signals from CSV file"""
+    def load_signals(self, signals_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Load signals from CSV file, limited to START_DATE..END_DATE
+        An already loaded signals frame can be passed in to skip the read (e.g. across scenarios)
+        """
         try:
-            print(f"📊 Loading signals from {self.CSV_PATH}")
-            signals_df = pd.read_csv(self.CSV_PATH)
-            signals_df['datetime'] = pd.to_datetime(signals_df['datetime'])
+            if signals_df is None:
+                print(f"📊 Loading signals from {self.CSV_PATH}")
+                # Pattern columns only hold +1/-1/0, so read them as int8 codes
+                pattern_dtypes = {f'pattern_{pattern_id}': np.int8 for pattern_id in self.PATTERN_NAMES}
+                signals_df = read_signals_csv(self.CSV_PATH, pattern_dtypes)
             
-            # Filter by date range
-            mask = (signals_df['datetime'] >= self.START_DATE) & (signals_df['datetime'] <= self.END_DATE)
-            signals_df = signals_df[mask].copy()
+            # The position jumps in analyze_pattern search the signal times, so keep them in time order
+            if not signals_df['datetime'].is_monotonic_increasing:
+                signals_df = signals_df.sort_values('datetime', kind='stable', ignore_index=True)
+            
+            # Filter by date range with two binary searches
+            signal_times = signals_df['datetime']
+            first = signal_times.searchsorted(pd.Timestamp(self.START_DATE), side='left')
+            last = signal_times.searchsorted(pd.Timestamp(self.END_DATE), side='right')
+            signals_df = signals_df.iloc[first:last].copy()
             
             print(f"📈 Loaded {len(signals_df)} signal data points from {signals_df['datetime'].min()} to {signals_df['datetime'].max()}")
             return signals_df
@@ -117,33 +363,312 @@ class IchimokuADXBacktester:
             print(f"❌ Error loading signals: {e}")
             raise
     
+    def _fetch_minute_data(self, start_time: datetime, end_time: datetime) -> pd.DataFrame:
+        """Query 1-minute bars from ClickHouse for the specified time range"""
+        # open/high/low are only carried along, so they come back as float32;
+        # close stays float64 because the exit scan and P&L are computed on it
+        query = """
+        SELECT datetime,
+               toFloat32(open) AS open,
+               toFloat32(high) AS high,
+               toFloat32(low) AS low,
+               close
+        FROM minute_data.spot
+        WHERE underlying_symbol = {symbol:String}
+          AND datetime >= {start:DateTime}
+          AND datetime <= {end:DateTime}
+        ORDER BY datetime
+        """
+        # Server-side bindings keep the query text identical for every range
+        parameters = {
+            'symbol': self.SYMBOL,
+            'start': start_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'end': end_time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        # query_df decodes the native columns straight into NumPy-backed Series,
+        # skipping the per-row tuples of result_rows
+        df = self.client.query_df(query, parameters=parameters)
+        
+        if df.empty:
+            return pd.DataFrame()
+        
+        # The native DateTime column already decodes to datetime64; only re-parse if it did not
+        if not pd.api.types.is_datetime64_any_dtype(df['datetime']):
+            df['datetime'] = pd.to_datetime(df['datetime'])
+        df = df.set_index('datetime')
+        # ORDER BY already sorts the bars, so this is normally skipped
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        
+        return df
+    
+    def load_minute_cache(self, signals_df: pd.DataFrame):
+        """
+        Fetch every minute bar the signals can touch in one query
+        get_minute_data and get_minute_window then slice this cache instead of querying per signal
+        """
+        if signals_df.empty:
+            return
+        
+        start_time = signals_df['datetime'].min()
+        end_time = signals_df['datetime'].max() + self._signal_offset + timedelta(minutes=self.MAX_HOLDING_MINUTES)
+        
+        try:
+            self._minute_cache = self._fetch_minute_data(start_time, end_time)
+            self._minute_times = self._minute_cache.index.to_numpy(dtype='datetime64[ns]')
+            self._minute_close = self._minute_cache['close'].to_numpy(dtype=np.float64) if not self._minute_cache.empty else np.empty(0)
+            print(f"📦 Cached {len(self._minute_cache)} minute bars from {start_time} to {end_time}")
+        except Exception as e:
+            # Fall back to one query per signal
+            self._minute_cache = None
+            print(f"⚠️  Could not bulk load minute data, querying per signal: {e}")
+    
+    def index_pattern_signals(self, signals_df: pd.DataFrame) -> Dict[int, np.ndarray]:
+        """
+        Row positions of every pattern's signals in signals_df, found in one pass over the pattern columns
+        analyze_pattern and the batched scans index the signal columns with these instead of masking per pattern
+        """
+        pattern_ids = [pattern_id for pattern_id in self.PATTERN_NAMES if f'pattern_{pattern_id}' in signals_df.columns]
+        pattern_matrix = signals_df[[f'pattern_{pattern_id}' for pattern_id in pattern_ids]].to_numpy()
+        self._pattern_rows = {pattern_id: np.flatnonzero(pattern_matrix[:, i]) for i, pattern_id in enumerate(pattern_ids)}
+        return self._pattern_rows
+    
+    def _signal_batch(self, signals_df: pd.DataFrame):
+        """
+        Entry, exit levels and window start of every pattern signal, flattened pattern by pattern
+        Returns None when signals_df has no pattern columns
+        """
+        signal_times = signals_df['datetime'].to_numpy(dtype='datetime64[ns]')
+        closes = signals_df['close'].to_numpy(dtype=np.float64)
+        
+        # Row positions of each pattern's signals, in the order analyze_pattern walks them
+        pattern_rows = self._pattern_rows or self.index_pattern_signals(signals_df)
+        if not pattern_rows:
+            return None
+        
+        rows = np.concatenate(list(pattern_rows.values()))
+        codes = np.concatenate([signals_df[f'pattern_{pattern_id}'].to_numpy()[pattern_rows[pattern_id]]
+                                for pattern_id in pattern_rows])
+        directions = np.where(codes == 1, 1, -1)
+        entry_prices = closes[rows]
+        stop_loss_prices = entry_prices * np.where(directions == 1, self._stop_loss_mult[1], self._stop_loss_mult[-1])
+        take_profit_prices = entry_prices * np.where(directions == 1, self._take_profit_mult[1], self._take_profit_mult[-1])
+        window_start = signal_times[rows] + np.timedelta64(self._signal_offset)
+        
+        return pattern_rows, window_start, entry_prices, directions, stop_loss_prices, take_profit_prices
+    
+    def _store_pattern_scans(self, pattern_rows: Dict[int, np.ndarray], bar_counts: np.ndarray,
+                             results: List[np.ndarray], window_starts: Optional[np.ndarray]):
+        """Split flattened scan columns back into one (bar_counts, results, window_starts) entry per pattern"""
+        offset = 0
+        for pattern_id, pattern_idx in pattern_rows.items():
+            batch = slice(offset, offset + len(pattern_idx))
+            self._pattern_scans[pattern_id] = (
+                bar_counts[batch],
+                [column[batch] for column in results],
+                window_starts[batch] if window_starts is not None else None
+            )
+            offset += len(pattern_idx)
+    
+    def scan_pattern_signals(self, signals_df: pd.DataFrame, batch: Tuple = None):
+        """
+        Run the exit scan for every signal of every pattern in one batched kernel call
+        Needs the minute cache; analyze_pattern then only assembles the trades it takes
+        batch is a precomputed _signal_batch result, prepared while the cache was loading
+        """
+        self._pattern_scans = {}
+        if self._minute_cache is None:
+            return
+        
+        if batch is None:
+            batch = self._signal_batch(signals_df)
+        if batch is None:
+            return
+        pattern_rows, window_start, entry_prices, directions, stop_loss_prices, take_profit_prices = batch
+        
+        # Minute window of each signal as [start, end) positions in the cache, inclusive of both bounds like .loc
+        window_end = window_start + np.timedelta64(self.MAX_HOLDING_MINUTES, 'm')
+        starts = np.searchsorted(self._minute_times, window_start, side='left')
+        ends = np.searchsorted(self._minute_times, window_end, side='right')
+        
+        results = scan_trades(self._minute_close, starts, ends, entry_prices, directions,
+                              stop_loss_prices, take_profit_prices, self.QUANTITY)
+        held_minutes, exit_codes = results[0], results[1]
+        
+        # Closes of the last held and the breaching minute, NaN where the trade has none
+        if len(self._minute_close):
+            last_bar = len(self._minute_close) - 1
+            last_held = np.clip(starts + held_minutes - 1, 0, last_bar)
+            breaching = np.minimum(starts + held_minutes, last_bar)
+            last_closes = np.where(held_minutes > 0, self._minute_close[last_held], np.nan)
+            exit_closes = np.where(exit_codes != EXIT_TIMEOUT, self._minute_close[breaching], np.nan)
+        else:
+            last_closes = exit_closes = np.full(len(starts), np.nan)
+        
+        self._store_pattern_scans(pattern_rows, ends - starts, list(results) + [last_closes, exit_closes], starts)
+    
+    def scan_pattern_signals_clickhouse(self, signals_df: pd.DataFrame) -> bool:
+        """
+        Compute the exit scan of every pattern signal inside ClickHouse with one aggregation query
+        Only per-signal exit statistics come back, no minute bars. Returns False when the
+        local scan has to be used instead (per-minute detail requested or the query failed)
+        
+        Windows are matched to bars by whole-minute timestamps, as 1-minute bars are stamped
+        """
+        self._pattern_scans = {}
+        if self.SAVE_MINUTE_DETAIL:
+            # Per-minute records need the bars themselves
+            return False
+        
+        batch = self._signal_batch(signals_df)
+        if batch is None:
+            return True
+        pattern_rows, window_start, entry_prices, directions, stop_loss_prices, take_profit_prices = batch
+        
+        # The signals travel with the query as an external table; sessions are off, so a
+        # temporary table would not outlive its CREATE statement
+        trades_in = pd.DataFrame({
+            'signal_id': np.arange(len(window_start)),
+            'start_ts': pd.DatetimeIndex(window_start).strftime('%Y-%m-%d %H:%M:%S'),
+            'entry': entry_prices,
+            'side': directions,
+            'sl': stop_loss_prices,
+            'tp': take_profit_prices
+        })
+        external_data = ExternalData(
+            file_name='trades_in.csv',
+            data=trades_in.to_csv(index=False, header=False).encode(),
+            fmt='CSV',
+            structure='signal_id UInt32, start_ts DateTime, entry Float64, side Int8, sl Float64, tp Float64'
+        )
+        
+        # Each signal is expanded to the minutes of its window and equi-joined to the bars, then the
+        # closes of the window are scanned with array functions the same way scan_trade walks them
+        query = """
+        SELECT signal_id,
+               length(c) AS bar_count,
+               arrayFirstIndex(x -> if(side = 1, x <= sl OR x >= tp, x >= sl OR x <= tp), c) AS breach,
+               if(breach = 0, bar_count, breach - 1) AS held_minutes,
+               multiIf(breach = 0, 0, if(side = 1, c[breach] <= sl, c[breach] >= sl), 1, 2) AS exit_code,
+               arrayMap(x -> (x - entry) * side * {quantity:Float64}, arraySlice(c, 1, held_minutes)) AS pnl,
+               arrayMax(arrayPushBack(pnl, 0.)) AS max_profit,
+               arrayMin(arrayPushBack(pnl, 0.)) AS max_loss,
+               arrayCount(x -> x > 0, pnl) AS profitable_minutes,
+               arrayFirstIndex(x -> x > 0, pnl) AS profit_start,
+               arrayFirstIndex(x -> x <= 0, pnl) AS loss_start,
+               if(held_minutes > 0, c[held_minutes], nan) AS last_close,
+               if(breach > 0, c[breach], nan) AS exit_close
+        FROM (
+            SELECT t.signal_id AS signal_id,
+                   any(t.entry) AS entry,
+                   any(t.side) AS side,
+                   any(t.sl) AS sl,
+                   any(t.tp) AS tp,
+                   arrayMap(bar -> bar.2, arraySort(groupArray((m.datetime, m.close)))) AS c
+            FROM (
+                SELECT *, addMinutes(start_ts, arrayJoin(range({window:UInt32} + 1))) AS datetime
+                FROM trades_in
+            ) AS t
+            INNER JOIN (
+                SELECT datetime, close
+                FROM minute_data.spot
+                WHERE underlying_symbol = {symbol:String}
+                  AND datetime >= {start:DateTime}
+                  AND datetime <= {end:DateTime}
+            ) AS m ON t.datetime = m.datetime
+            GROUP BY t.signal_id
+        )
+        """
+        start_time = pd.Timestamp(window_start.min())
+        end_time = pd.Timestamp(window_start.max()) + timedelta(minutes=self.MAX_HOLDING_MINUTES)
+        parameters = {
+            'quantity': float(self.QUANTITY),
+            'window': self.MAX_HOLDING_MINUTES,
+            'symbol': self.SYMBOL,
+            'start': start_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'end': end_time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        try:
+            df = self.client.query_df(query, parameters=parameters, external_data=external_data)
+        except Exception as e:
+            print(f"⚠️  Could not scan exits in ClickHouse, scanning cached minute data: {e}")
+            return False
+        
+        # Signals without any bar in their window get no row; they keep a bar count of 0
+        n = len(window_start)
+        signal_ids = df['signal_id'].to_numpy(dtype=np.int64)
+        bar_counts = np.zeros(n, dtype=np.int64)
+        bar_counts[signal_ids] = df['bar_count'].to_numpy()
+        results = []
+        for column, dtype in (('held_minutes', np.int64), ('exit_code', np.int64), ('max_profit', np.float64),
+                              ('max_loss', np.float64), ('profitable_minutes', np.int64), ('profit_start', np.int64),
+                              ('loss_start', np.int64), ('last_close', np.float64), ('exit_close', np.float64)):
+            values = np.zeros(n, dtype=dtype)
+            values[signal_ids] = df[column].to_numpy(dtype=dtype)
+            results.append(values)
+        
+        self._store_pattern_scans(pattern_rows, bar_counts, results, None)
+        print(f"🧮 Scanned exits of {n} signals in ClickHouse")
+        return True
+    
+    def _trade_from_scan(self, pattern_id: int, j: int, signal_time: datetime,
+                         signal_type: int, entry_price: float) -> Dict[str, Any]:
+        """Trade for the j-th signal of a pattern from the batched scan, None when no minute data"""
+        bar_counts, results, window_starts = self._pattern_scans[pattern_id]
+        if bar_counts[j] == 0:
+            return None
+        
+        scan = tuple(column[j].item() for column in results[:7])
+        last_close, exit_close = results[7][j].item(), results[8][j].item()
+        close = timestamps = None
+        if window_starts is not None:
+            window = slice(window_starts[j], window_starts[j] + bar_counts[j])
+            close, timestamps = self._minute_close[window], self._minute_times[window]
+        return self._build_trade(signal_time, signal_time + self._signal_offset, signal_type, entry_price,
+                                 scan, last_close, exit_close, close, timestamps)
+    
     def get_minute_data(self, start_time: datetime, end_time: datetime) -> pd.DataFrame:
-        """Get 1-minute data from ClickHouse for the specified time range"""
+        """Get 1-minute data for the specified time range, from the bulk cache when loaded"""
+        if self._minute_cache is not None:
+            return self._minute_cache.loc[start_time:end_time]
+        
         try:
-            query = f"""
-            SELECT datetime, open, high, low, close
-            FROM minute_data.spot
-            WHERE underlying_symbol = '{self.SYMBOL}'
-              AND datetime >= '{start_time.strftime('%Y-%m-%d %H:%M:%S')}'
-              AND datetime <= '{end_time.strftime('%Y-%m-%d %H:%M:%S')}'
-            ORDER BY datetime
-            """
-            
-            result = self.client.query(query)
-            
-            if not result.result_rows:
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(result.result_rows, columns=result.column_names)
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            df = df.set_index('datetime')
-            
-            return df
+            return self._fetch_minute_data(start_time, end_time)
             
         except Exception as e:
             print(f"❌ Error fetching minute data: {e}")
             return pd.DataFrame()
     
+    def get_minute_window(self, start_time: datetime, end_time: datetime) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Close prices and timestamps of the 1-minute bars in [start_time, end_time]
+        With the bulk cache loaded this is two searchsorted calls and array views, no DataFrame
+        """
+        if self._minute_cache is not None:
+            lo = np.searchsorted(self._minute_times, np.datetime64(start_time, 'ns'), side='left')
+            hi = np.searchsorted(self._minute_times, np.datetime64(end_time, 'ns'), side='right')
+            return self._minute_close[lo:hi], self._minute_times[lo:hi]
+        
+        minute_data = self.get_minute_data(start_time, end_time)
+        if minute_data.empty:
+            return np.empty(0), np.empty(0, dtype='datetime64[ns]')
+        return minute_data['close'].to_numpy(dtype=np.float64), minute_data.index.to_numpy(dtype='datetime64[ns]')
+    
+    def _signal_delay(self) -> timedelta:
+        """
+        Time from a signal bar's timestamp to its close, cached as _signal_offset
+        If signal came at 9:45 on 5min data, it actually came at 9:50 (candle close)
+        """
+        if self.TIMEFRAME == "5min":
+            return timedelta(minutes=5)
+        elif self.TIMEFRAME == "10min":
+            return timedelta(minutes=10)
+        elif self.TIMEFRAME == "15min":
+            return timedelta(minutes=15)
+        return timedelta(0)
+    
     def analyze_signal_accuracy(self, signal_time: datetime, signal_type: int, entry_price: float) -> Dict[str, Any]:
         """
         Analyze how long a signal was profitable and by how much
@@ -153,114 +678,73 @@ class IchimokuADXBacktester:
         if signal_type == 0:
             return None
         
-        # Adjust signal time based on timeframe
-        # If signal came at 9:45 on 5min data, it actually came at 9:50 (candle close)
-        if self.TIMEFRAME == "5min":
-            adjusted_signal_time = signal_time + timedelta(minutes=5)
-        elif self.TIMEFRAME == "10min":
-            adjusted_signal_time = signal_time + timedelta(minutes=10)
-        elif self.TIMEFRAME == "15min":
-            adjusted_signal_time = signal_time + timedelta(minutes=15)
-        else:
-            adjusted_signal_time = signal_time
+        # Adjust signal time based on timeframe (signals act on the candle close)
+        adjusted_signal_time = signal_time + self._signal_offset
         
-        # Get minute data for analysis period
+        # Get minute closes for analysis period
         end_time = adjusted_signal_time + timedelta(minutes=self.MAX_HOLDING_MINUTES)
-        minute_data = self.get_minute_data(adjusted_signal_time, end_time)
+        close, timestamps = self.get_minute_window(adjusted_signal_time, end_time)
         
-        if minute_data.empty:
+        if len(close) == 0:
             return None
         
+        # Scan the raw close prices for the exit minute and profitability stats
+        stop_loss_price, take_profit_price = self._exit_levels(signal_type, entry_price)
+        direction = 1 if signal_type == 1 else -1
+        scan = scan_trade(
+            close, entry_price, direction, stop_loss_price, take_profit_price, self.QUANTITY
+        )
+        
+        held_minutes = scan[0]
+        last_close = close[held_minutes - 1] if held_minutes > 0 else np.nan
+        exit_close = close[held_minutes] if held_minutes < len(close) else np.nan
+        return self._build_trade(signal_time, adjusted_signal_time, signal_type, entry_price,
+                                 scan, last_close, exit_close, close, timestamps)
+    
+    def _exit_levels(self, signal_type: int, entry_price: float) -> Tuple[float, float]:
+        """Stop loss and take profit prices for a position opened at entry_price"""
+        direction = 1 if signal_type == 1 else -1  # Buy or sell signal
+        return entry_price * self._stop_loss_mult[direction], entry_price * self._take_profit_mult[direction]
+    
+    def _build_trade(self, signal_time: datetime, adjusted_signal_time: datetime, signal_type: int,
+                     entry_price: float, scan: Tuple, last_close: float, exit_close: float,
+                     close: np.ndarray = None, timestamps: np.ndarray = None) -> Dict[str, Any]:
+        """
+        Assemble the trade record from a scan_trade result
+        last_close and exit_close are the closes of the last held and the breaching minute;
+        close and timestamps cover the scanned minute window and are only needed for SAVE_MINUTE_DETAIL
+        """
+        (held_minutes, exit_code, max_profit, max_loss, total_profitable_minutes,
+         profit_duration, loss_duration) = scan
+        
         # Calculate transaction costs
         buy_cost = entry_price * self.QUANTITY * self.TRANSACTION_COST
         sell_cost = 0  # Will be calculated at exit
         
-        # Initialize tracking variables
-        max_profit = 0
-        max_loss = 0
-        profit_duration = 0
-        loss_duration = 0
-        total_profitable_minutes = 0
-        total_loss_minutes = 0
-        
-        # Calculate stop loss and take profit levels
-        if signal_type == 1:  # Buy signal
-            stop_loss_price = entry_price * (1 - self.STOP_LOSS_PCT)
-            take_profit_price = entry_price * (1 + self.TAKE_PROFIT_PCT)
-            position_direction = "BUY"
-        else:  # Sell signal
-            stop_loss_price = entry_price * (1 + self.STOP_LOSS_PCT)
-            take_profit_price = entry_price * (1 - self.TAKE_PROFIT_PCT)
-            position_direction = "SELL"
-        
-        minute_results = []
+        stop_loss_price, take_profit_price = self._exit_levels(signal_type, entry_price)
+        position_direction = "BUY" if signal_type == 1 else "SELL"
+        direction = 1 if signal_type == 1 else -1
+        
+        total_loss_minutes = held_minutes - total_profitable_minutes
+        
         exit_reason = None
         exit_minute = None
+        if exit_code != EXIT_TIMEOUT:
+            # The breaching minute closes the position
+            exit_reason = "Stop Loss" if exit_code == EXIT_STOP_LOSS else "Take Profit"
+            exit_minute = held_minutes + 1
+            sell_cost = exit_close * self.QUANTITY * self.TRANSACTION_COST
         
-        for i, (timestamp, row) in enumerate(minute_data.iterrows()):
-            current_price = row['close']
-            
-            # Calculate P&L with quantity-based approach
-            if signal_type == 1:  # Buy signal
-                # P&L = (Current Price - Entry Price) * Quantity - Transaction Costs
-                gross_pnl = (current_price - entry_price) * self.QUANTITY
-                # Check stop loss and take profit
-                if current_price <= stop_loss_price:
-                    exit_reason = "Stop Loss"
-                    exit_minute = i + 1
-                    sell_cost = current_price * self.QUANTITY * self.TRANSACTION_COST
-                    break
-                elif current_price >= take_profit_price:
-                    exit_reason = "Take Profit"
-                    exit_minute = i + 1
-                    sell_cost = current_price * self.QUANTITY * self.TRANSACTION_COST
-                    break
-            else:  # Sell signal
-                # P&L = (Entry Price - Current Price) * Quantity - Transaction Costs
-                gross_pnl = (entry_price - current_price) * self.QUANTITY
-                # Check stop loss and take profit
-                if current_price >= stop_loss_price:
-                    exit_reason = "Stop Loss"
-                    exit_minute = i + 1
-                    sell_cost = current_price * self.QUANTITY * self.TRANSACTION_COST
-                    break
-                elif current_price <= take_profit_price:
-                    exit_reason = "Take Profit"
-                    exit_minute = i + 1
-                    sell_cost = current_price * self.QUANTITY * self.TRANSACTION_COST
-                    break
-            
-            # Net P&L includes transaction costs
-            net_pnl = gross_pnl - buy_cost
-            pnl_pct = (gross_pnl / (entry_price * self.QUANTITY)) * 100 if entry_price > 0 else 0
-            
-            # Track profitability
-            if gross_pnl > 0:
-                max_profit = max(max_profit, gross_pnl)
-                total_profitable_minutes += 1
-                if profit_duration == 0:
-                    profit_duration = i + 1
-            else:
-                max_loss = min(max_loss, gross_pnl)
-                total_loss_minutes += 1
-                if loss_duration == 0:
-                    loss_duration = i + 1
-            
-            minute_results.append({
-                'minute': i + 1,
-                'timestamp': timestamp,
-                'price': current_price,
-                'gross_pnl': gross_pnl,
-                'net_pnl': net_pnl,
-                'pnl_pct': pnl_pct,
-                'cumulative_profit_minutes': total_profitable_minutes,
-                'cumulative_loss_minutes': total_loss_minutes
-            })
+        # Per-minute records are only built when SAVE_MINUTE_DETAIL is set
+        minute_results = None
+        if self.SAVE_MINUTE_DETAIL and close is not None:
+            minute_results = self._minute_records(close, timestamps, held_minutes, entry_price, direction, buy_cost)
         
         # Calculate final metrics
-        if minute_results:
-            final_price = minute_results[-1]['price']
-            final_gross_pnl = minute_results[-1]['gross_pnl']
+        if held_minutes > 0:
+            # Last held minute, P&L = (Current Price - Entry Price) * Quantity for buys, reversed for sells
+            final_price = last_close
+            final_gross_pnl = (final_price - entry_price) * self.QUANTITY * direction
             
             # If exited due to stop loss or take profit, use that exit price
             if exit_reason:
@@ -305,9 +789,38 @@ class IchimokuADXBacktester:
             'exit_reason': exit_reason,
             'exit_minute': exit_minute,
             'minute_by_minute': minute_results,
-            'total_minutes_analyzed': len(minute_results)
+            'total_minutes_analyzed': held_minutes
         }
     
+    def _minute_records(self, close: np.ndarray, timestamps: np.ndarray, held_minutes: int,
+                        entry_price: float, direction: int, buy_cost: float) -> np.ndarray:
+        """Minute-by-minute P&L of a trade up to its exit, as MINUTE_RECORD_DTYPE records"""
+        # P&L = (Current Price - Entry Price) * Quantity for buys, reversed for sells
+        held_close = close[:held_minutes]
+        held_pnl = (held_close - entry_price) * self.QUANTITY * direction
+        cumulative_profit_minutes = np.cumsum(held_pnl > 0)
+        cumulative_loss_minutes = np.arange(1, held_minutes + 1) - cumulative_profit_minutes
+        
+        # Net P&L includes transaction costs
+        net_pnl = held_pnl - buy_cost
+        if entry_price > 0:
+            pnl_pct = held_pnl / (entry_price * self.QUANTITY) * 100
+        else:
+            pnl_pct = np.zeros(held_minutes)
+        
+        # Pre-allocate one record per held minute and fill it column by column
+        minute_results = np.empty(held_minutes, dtype=MINUTE_RECORD_DTYPE)
+        minute_results['minute'] = np.arange(1, held_minutes + 1)
+        minute_results['timestamp'] = timestamps[:held_minutes]
+        minute_results['price'] = held_close
+        minute_results['gross_pnl'] = held_pnl
+        minute_results['net_pnl'] = net_pnl
+        minute_results['pnl_pct'] = pnl_pct
+        minute_results['cumulative_profit_minutes'] = cumulative_profit_minutes
+        minute_results['cumulative_loss_minutes'] = cumulative_loss_minutes
+        
+        return minute_results
+    
     def analyze_pattern(self, pattern_id: int, signals_df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze a specific pattern's performance with position tracking"""
         pattern_col = f'pattern_{pattern_id}'
@@ -315,19 +828,23 @@ class IchimokuADXBacktester:
         
         print(f"\n🔍 Analyzing Pattern {pattern_id}: {pattern_name}")
         
-        # Get all signals for this pattern
-        pattern_signals = signals_df[signals_df[pattern_col] != 0].copy()
+        # Row positions of this pattern's signals, indexed once for all patterns
+        if pattern_id in self._pattern_rows:
+            rows = self._pattern_rows[pattern_id]
+        else:
+            rows = np.flatnonzero(signals_df[pattern_col].to_numpy())
         
-        if pattern_signals.empty:
+        if len(rows) == 0:
             print(f"⚠️  No signals found for pattern {pattern_id}")
             return {
                 'pattern_id': pattern_id,
                 'pattern_name': pattern_name,
                 'total_signals': 0,
-                'trades': []
+                'trades': [],
+                'trade_records': np.empty(0, dtype=TRADE_RECORD_DTYPE)
             }
         
-        print(f"📊 Found {len(pattern_signals)} signals for pattern {pattern_id}")
+        print(f"📊 Found {len(rows)} signals for pattern {pattern_id}")
         
         trades = []
         buy_signals = 0
@@ -338,22 +855,24 @@ class IchimokuADXBacktester:
         active_position = None  # None, 'LONG', or 'SHORT'
         position_exit_time = None
         
-        for idx, row in pattern_signals.iterrows():
-            signal_type = row[pattern_col]
-            signal_time = row['datetime']
-            entry_price = row['close']
-            
-            # Check if we have an active position that hasn't expired yet
-            if active_position is not None and position_exit_time is not None:
-                if signal_time < position_exit_time:
-                    # Position is still active, skip this signal
-                    skipped_signals += 1
-                    print(f"⏭️  Skipping signal at {signal_time} - {active_position} position still active until {position_exit_time}")
-                    continue
-                else:
-                    # Position has expired, clear it
-                    active_position = None
-                    position_exit_time = None
+        # Exits were scanned in one batch when the minute cache is loaded or ClickHouse computed them
+        batched = pattern_id in self._pattern_scans
+        
+        # Plain column arrays; signals are in time order so searchsorted can find the next free one
+        signal_times = signals_df['datetime'].take(rows).tolist()
+        signal_times_ns = signals_df['datetime'].to_numpy(dtype='datetime64[ns]')[rows]
+        adjusted_times_ns = signal_times_ns + np.timedelta64(self._signal_offset)
+        
+        # At most one trade per signal, so the record array can be allocated up front
+        records = np.empty(len(rows), dtype=TRADE_RECORD_DTYPE)
+        signal_types = signals_df[pattern_col].to_numpy()[rows]
+        entry_prices = signals_df['close'].to_numpy()[rows]
+        
+        j = 0
+        while j < len(signal_times):
+            signal_time = signal_times[j]
+            signal_type = signal_types[j]
+            entry_price = entry_prices[j]
             
             if signal_type == 1:
                 buy_signals += 1
@@ -361,11 +880,21 @@ class IchimokuADXBacktester:
                 sell_signals += 1
             
             # Analyze this signal
-            analysis = self.analyze_signal_accuracy(signal_time, signal_type, entry_price)
+            if batched:
+                analysis = self._trade_from_scan(pattern_id, j, signal_time, signal_type, entry_price)
+            else:
+                analysis = self.analyze_signal_accuracy(signal_time, signal_type, entry_price)
             
+            next_j = j + 1
             if analysis:
                 analysis['pattern_id'] = pattern_id
                 analysis['pattern_name'] = pattern_name
+                records[len(trades)] = (
+                    signal_times_ns[j], 1 if signal_type == 1 else -1, entry_price, analysis['exit_price'],
+                    analysis['gross_pnl'], analysis['net_pnl'], analysis['transaction_costs'],
+                    analysis['max_profit'], analysis['max_loss'], analysis['total_profitable_minutes'],
+                    analysis['total_loss_minutes'], analysis['total_minutes_analyzed']
+                )
                 trades.append(analysis)
                 
                 # Update position tracking
@@ -374,41 +903,54 @@ class IchimokuADXBacktester:
                 elif signal_type == -1:
                     active_position = 'SHORT'
                 
-                # Calculate position exit time based on the analysis
-                adjusted_signal_time = analysis['adjusted_signal_time']
+                # Calculate position exit time based on the analysis, on datetime64 values
                 if analysis['exit_reason'] and analysis['exit_minute']:
                     # Position exited early due to stop loss or take profit
-                    position_exit_time = adjusted_signal_time + timedelta(minutes=analysis['exit_minute'])
+                    position_minutes = analysis['exit_minute']
                 else:
                     # Position held for maximum duration
-                    position_exit_time = adjusted_signal_time + timedelta(minutes=self.MAX_HOLDING_MINUTES)
+                    position_minutes = self.MAX_HOLDING_MINUTES
+                position_exit_ns = adjusted_times_ns[j] + np.timedelta64(position_minutes, 'm')
+                
+                # Jump straight to the first signal at or after the exit; everything before it is skipped
+                next_j = max(next_j, int(np.searchsorted(signal_times_ns, position_exit_ns, side='left')))
+                skipped = next_j - j - 1
+                if skipped:
+                    skipped_signals += skipped
+                    position_exit_time = pd.Timestamp(position_exit_ns)
+                    print(f"⏭️  Skipping {skipped} signal(s) from {signal_times[j + 1]} to {signal_times[next_j - 1]} - {active_position} position still active until {position_exit_time}")
+            
+            j = next_j
         
         print(f"✅ Analyzed {len(trades)} trades for pattern {pattern_id} ({buy_signals} buys, {sell_signals} sells, {skipped_signals} skipped)")
         
-        # Calculate pattern statistics
+        # Calculate pattern statistics on the record columns
+        records = records[:len(trades)]
         if trades:
-            profitable_trades = [t for t in trades if t['net_pnl'] > 0]
-            losing_trades = [t for t in trades if t['net_pnl'] <= 0]
+            net_pnl = records['net_pnl']
+            profitable = net_pnl > 0
+            profitable_count = int(np.count_nonzero(profitable))
+            losing_count = len(trades) - profitable_count
             
-            win_rate = len(profitable_trades) / len(trades) * 100
-            avg_profit = np.mean([t['net_pnl'] for t in profitable_trades]) if profitable_trades else 0
-            avg_loss = np.mean([t['net_pnl'] for t in losing_trades]) if losing_trades else 0
-            avg_profit_duration = np.mean([t['total_profitable_minutes'] for t in trades])
-            avg_loss_duration = np.mean([t['total_loss_minutes'] for t in trades])
-            total_pnl = sum([t['net_pnl'] for t in trades])
-            total_gross_pnl = sum([t['gross_pnl'] for t in trades])
-            total_transaction_costs = sum([t['transaction_costs'] for t in trades])
+            win_rate = profitable_count / len(trades) * 100
+            avg_profit = net_pnl[profitable].mean() if profitable_count else 0
+            avg_loss = net_pnl[~profitable].mean() if losing_count else 0
+            avg_profit_duration = records['profitable_minutes'].mean()
+            avg_loss_duration = records['loss_minutes'].mean()
+            total_pnl = net_pnl.sum()
+            total_gross_pnl = records['gross_pnl'].sum()
+            total_transaction_costs = records['transaction_costs'].sum()
             
             pattern_stats = {
                 'pattern_id': pattern_id,
                 'pattern_name': pattern_name,
-                'total_signals': len(pattern_signals),
+                'total_signals': len(rows),
                 'analyzed_trades': len(trades),
                 'skipped_signals': skipped_signals,
                 'buy_signals': buy_signals,
                 'sell_signals': sell_signals,
-                'profitable_trades': len(profitable_trades),
-                'losing_trades': len(losing_trades),
+                'profitable_trades': profitable_count,
+                'losing_trades': losing_count,
                 'win_rate': win_rate,
                 'avg_profit': avg_profit,
                 'avg_loss': avg_loss,
@@ -417,24 +959,26 @@ class IchimokuADXBacktester:
                 'total_net_pnl': total_pnl,
                 'total_gross_pnl': total_gross_pnl,
                 'total_transaction_costs': total_transaction_costs,
-                'max_single_profit': max([t['max_profit'] for t in trades]) if trades else 0,
-                'max_single_loss': min([t['max_loss'] for t in trades]) if trades else 0,
-                'trades': trades
+                'max_single_profit': records['max_profit'].max(),
+                'max_single_loss': records['max_loss'].min(),
+                'trades': trades,
+                'trade_records': records
             }
         else:
             pattern_stats = {
                 'pattern_id': pattern_id,
                 'pattern_name': pattern_name,
-                'total_signals': len(pattern_signals),
+                'total_signals': len(rows),
                 'analyzed_trades': 0,
                 'skipped_signals': skipped_signals,
-                'trades': []
+                'trades': [],
+                'trade_records': records
             }
         
         return pattern_stats
     
-    def run_comprehensive_backtest(self) -> Dict[str, Any]:
-        """Run backtest for all patterns"""
+    def run_comprehensive_backtest(self, signals_df: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """Run backtest for all patterns, on signals_df when given instead of reading CSV_PATH"""
         print("🚀 Starting Comprehensive Ichimoku-ADX Backtest")
         print("=" * 60)
         print(f"📅 Period: {self.START_DATE} to {self.END_DATE}")
@@ -447,25 +991,55 @@ class IchimokuADXBacktester:
         print(f"� Transaction Cost: {self.TRANSACTION_COST*100}%")
         
         # Load signals
-        signals_df = self.load_signals()
+        signals_df = self.load_signals(signals_df)
+        self.index_pattern_signals(signals_df)
+        
+        # Either let ClickHouse compute the exits, or fetch all minute bars once instead of one query per signal
+        if not (self.SCAN_IN_CLICKHOUSE and self.scan_pattern_signals_clickhouse(signals_df)):
+            # The bulk minute query runs in the background while the signal side of the scan is prepared
+            with ThreadPoolExecutor(max_workers=1) as prefetch:
+                minute_cache = prefetch.submit(self.load_minute_cache, signals_df)
+                batch = self._signal_batch(signals_df)
+                minute_cache.result()
+            self.scan_pattern_signals(signals_df, batch)
         
         # Analyze each pattern
         all_pattern_results = {}
         all_trades = []
         
-        for pattern_id in range(10):  # Patterns 0-9
-            pattern_results = self.analyze_pattern(pattern_id, signals_df)
-            all_pattern_results[pattern_id] = pattern_results
-            all_trades.extend(pattern_results['trades'])
+        # Patterns track their positions independently. When their exits were batch scanned
+        # only GIL-bound record assembly is left, so they run serially; otherwise each pattern
+        # mostly waits on per-signal ClickHouse queries and they share a thread pool
+        pattern_ids = range(10)  # Patterns 0-9
+        analyze = partial(self.analyze_pattern, signals_df=signals_df)
+        if self._pattern_scans or self.MAX_WORKERS <= 1:
+            pattern_results_iter = map(analyze, pattern_ids)
+            executor = None
+        else:
+            executor = ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(pattern_ids)))
+            pattern_results_iter = executor.map(analyze, pattern_ids)
         
-        # Calculate overall statistics
+        try:
+            # map keeps the results in pattern order
+            for pattern_id, pattern_results in zip(pattern_ids, pattern_results_iter):
+                all_pattern_results[pattern_id] = pattern_results
+                all_trades.extend(pattern_results['trades'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        # One ledger of the PnL table fields of every trade; save_results writes it per pattern
+        self._trades_df = pd.DataFrame.from_records(all_trades, columns=['pattern_id', *PNL_TRADE_COLUMNS])
+        
+        # Calculate overall statistics on the concatenated trade records, kept in the results for the reports
+        all_records = np.concatenate([pattern_results['trade_records'] for pattern_results in all_pattern_results.values()])
         if all_trades:
-            total_profitable = len([t for t in all_trades if t['net_pnl'] > 0])
+            total_profitable = int(np.count_nonzero(all_records['net_pnl'] > 0))
             total_trades = len(all_trades)
             overall_win_rate = total_profitable / total_trades * 100
-            overall_net_pnl = sum([t['net_pnl'] for t in all_trades])
-            overall_gross_pnl = sum([t['gross_pnl'] for t in all_trades])
-            overall_transaction_costs = sum([t['transaction_costs'] for t in all_trades])
+            overall_net_pnl = all_records['net_pnl'].sum()
+            overall_gross_pnl = all_records['gross_pnl'].sum()
+            overall_transaction_costs = all_records['transaction_costs'].sum()
             total_skipped_signals = sum([pattern_results.get('skipped_signals', 0) for pattern_results in all_pattern_results.values()])
             
             overall_stats = {
@@ -477,7 +1051,7 @@ class IchimokuADXBacktester:
                 'total_gross_pnl': overall_gross_pnl,
                 'total_transaction_costs': overall_transaction_costs,
                 'total_skipped_signals': total_skipped_signals,
-                'avg_trade_duration': np.mean([len(t['minute_by_minute']) for t in all_trades]),
+                'avg_trade_duration': all_records['held_minutes'].mean(),
                 'total_quantity_traded': total_trades * self.QUANTITY
             }
         else:
@@ -500,16 +1074,31 @@ class IchimokuADXBacktester:
                 'end_date': self.END_DATE,
                 'symbol': self.SYMBOL,
                 'initial_capital': self.INITIAL_CAPITAL,
-                'position_size': self.POSITION_SIZE
+                'position_size': self.POSITION_SIZE,
+                'quantity': self.QUANTITY,
+                'stop_loss_pct': self.STOP_LOSS_PCT,
+                'take_profit_pct': self.TAKE_PROFIT_PCT,
+                'transaction_cost_pct': self.TRANSACTION_COST
             },
             'overall_stats': overall_stats,
             'pattern_results': all_pattern_results,
-            'all_trades': all_trades
+            'all_trades': all_trades,
+            'trade_records': all_records
         }
         
         self.results = results
+        self._pattern_metrics_cache = {}
+        self._financial_metrics_cache = {}
         return results
     
+    def _ranked_patterns(self) -> List[Tuple[int, Dict]]:
+        """(pattern_id, pattern_data) of the patterns with trades, best net P&L first"""
+        return sorted(
+            [(k, v) for k, v in self.results['pattern_results'].items() if v.get('analyzed_trades', 0) > 0],
+            key=lambda x: x[1]['total_net_pnl'],
+            reverse=True
+        )
+    
     def print_summary(self):
         """Print simple summary of backtest results"""
         if not self.results:
@@ -551,7 +1140,7 @@ class IchimokuADXBacktester:
         
         # Top patterns
         if patterns_with_trades:
-            sorted_patterns = sorted(patterns_with_trades, key=lambda x: x[1]['total_net_pnl'], reverse=True)
+            sorted_patterns = self._ranked_patterns()
             print(f"\n🏆 TOP 5 PATTERNS BY P&L:")
             for i, (pattern_id, data) in enumerate(sorted_patterns[:5]):
                 print(f"   {i+1}. Pattern {pattern_id}: {data['pattern_name']} - ₹{data['total_net_pnl']:,.2f}")
@@ -559,6 +1148,19 @@ class IchimokuADXBacktester:
         print(f"\n⏰ Analysis completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 80)
     
+    def _write_table(self, df: pd.DataFrame, output_dir: str, name: str) -> str:
+        """
+        Write a results table as CSV, or as zstd-compressed Parquet when RESULTS_FORMAT is 'parquet'
+        CSV goes through pyarrow's multithreaded writer when it is installed
+        """
+        if self.RESULTS_FORMAT == 'parquet':
+            path = os.path.join(output_dir, f"{name}.parquet")
+            df.to_parquet(path, compression='zstd', index=False)
+        else:
+            path = os.path.join(output_dir, f"{name}.csv")
+            write_csv(df, path)
+        return path
+    
     def save_results(self, output_dir: str = None):
         """Save pattern-wise PnL CSV files"""
         if not self.results:
@@ -599,70 +1201,64 @@ class IchimokuADXBacktester:
         # Create pattern-wise PnL CSV files
         saved_files = []
         
-        for pattern_id, pattern_data in self.results['pattern_results'].items():
-            if pattern_data.get('trades', []):
-                trades = pattern_data['trades']
-                pattern_name = pattern_data['pattern_name']
-                
-                # Create clean PnL DataFrame
-                pnl_data = []
-                for trade in trades:
-                    pnl_data.append({
-                        'signal_time': trade['signal_time'],
-                        'position_entry_time': trade['adjusted_signal_time'],
-                        'position_exit_time': trade['adjusted_signal_time'] + timedelta(minutes=trade['total_minutes_analyzed']),
-                        'signal_type': trade['signal_type'],
-                        'buy_price': trade['entry_price'],
-                        'sell_price': trade['exit_price'],
-                        'quantity': trade['quantity'],
-                        'gross_pnl': trade['gross_pnl'],
-                        'net_pnl': trade['net_pnl'],
-                        'transaction_costs': trade['transaction_costs'],
-                        'exit_reason': trade['exit_reason'] or 'Timeout',
-                        'holding_minutes': trade['total_minutes_analyzed']
-                    })
-                
-                pnl_df = pd.DataFrame(pnl_data)
+        # Build the PnL tables column-wise from the trade ledger, then split it by pattern
+        pnl_ledger = self._trades_df.rename(columns=PNL_TRADE_COLUMNS)
+        pnl_ledger.insert(3, 'position_exit_time', pnl_ledger['position_entry_time'] + pd.to_timedelta(pnl_ledger['holding_minutes'], unit='m'))
+        pnl_ledger['exit_reason'] = pnl_ledger['exit_reason'].fillna('Timeout')
+        
+        # Table writes run on a thread pool (pyarrow's CSV and Parquet writers release the GIL)
+        # while the next table is being prepared; results are reported in submission order
+        with ThreadPoolExecutor(max_workers=max(1, self.MAX_WORKERS)) as writer:
+            pattern_writes = []
+            for pattern_id, pnl_df in pnl_ledger.groupby('pattern_id', sort=False):
+                # Sort by signal time; trades are already in order, so the stable sort is a single pass
+                pnl_df = pnl_df.drop(columns='pattern_id').sort_values('signal_time', kind='mergesort').reset_index(drop=True)
                 
-                # Sort by signal time
-                pnl_df = pnl_df.sort_values('signal_time').reset_index(drop=True)
-                
-                # Save pattern-specific CSV
-                pattern_filename = f"pattern_{pattern_id}_{pattern_name.replace(' ', '_').replace('/', '_')}_pnl.csv"
-                pattern_path = os.path.join(output_dir, pattern_filename)
-                pnl_df.to_csv(pattern_path, index=False)
+                # Save pattern-specific trade table
+                pattern_filename = f"pattern_{pattern_id}_{self._pattern_slugs[pattern_id]}_pnl"
+                pattern_writes.append((pattern_id, len(pnl_df), writer.submit(self._write_table, pnl_df, output_dir, pattern_filename)))
+            
+            # Per-minute trade detail is only materialized when it was kept during the backtest
+            detail_write = None
+            if self.SAVE_MINUTE_DETAIL and self.results['all_trades']:
+                detail_frames = []
+                for trade in self.results['all_trades']:
+                    records = trade.get('minute_by_minute')
+                    if records is not None and len(records):
+                        detail_df = pd.DataFrame(records)
+                        detail_df.insert(0, 'signal_time', trade['signal_time'])
+                        detail_df.insert(0, 'pattern_id', trade['pattern_id'])
+                        detail_frames.append(detail_df)
                 
+                if detail_frames:
+                    detail_write = writer.submit(self._write_table, pd.concat(detail_frames, ignore_index=True), output_dir, 'minute_by_minute')
+            
+            for pattern_id, trade_count, pattern_write in pattern_writes:
+                pattern_path = pattern_write.result()
                 saved_files.append(pattern_path)
-                print(f"💾 Saved Pattern {pattern_id} PnL ({len(pnl_df)} trades) to {pattern_filename}")
-        
-        # Create a summary of all patterns
-        summary_data = []
-        total_trades = 0
-        total_pnl = 0
+                print(f"💾 Saved Pattern {pattern_id} PnL ({trade_count} trades) to {os.path.basename(pattern_path)}")
+            
+            if detail_write is not None:
+                print(f"💾 Saved minute-by-minute trade detail to {os.path.basename(detail_write.result())}")
         
-        for pattern_id, pattern_data in self.results['pattern_results'].items():
-            trades = pattern_data.get('trades', [])
-            if trades:
-                pattern_pnl = sum([t['net_pnl'] for t in trades])
-                profitable_trades = len([t for t in trades if t['net_pnl'] > 0])
-                win_rate = (profitable_trades / len(trades)) * 100 if trades else 0
-                
-                summary_data.append({
-                    'pattern_id': pattern_id,
-                    'pattern_name': pattern_data['pattern_name'],
-                    'total_trades': len(trades),
-                    'profitable_trades': profitable_trades,
-                    'win_rate_pct': round(win_rate, 2),
-                    'total_net_pnl': round(pattern_pnl, 2),
-                    'skipped_signals': pattern_data.get('skipped_signals', 0)
-                })
-                
-                total_trades += len(trades)
-                total_pnl += pattern_pnl
+        # Create a summary of all patterns, one column at a time instead of a dict per row
+        # Reuse the statistics analyze_pattern already computed instead of rescanning the trades
+        traded = [(pattern_id, pattern_data) for pattern_id, pattern_data in self.results['pattern_results'].items()
+                  if pattern_data.get('trades', [])]
         
         # Save summary
-        if summary_data:
-            summary_df = pd.DataFrame(summary_data)
+        if traded:
+            summary_df = pd.DataFrame({
+                'pattern_id': [pattern_id for pattern_id, _ in traded],
+                'pattern_name': [pattern_data['pattern_name'] for _, pattern_data in traded],
+                'total_trades': [pattern_data['analyzed_trades'] for _, pattern_data in traded],
+                'profitable_trades': [pattern_data['profitable_trades'] for _, pattern_data in traded],
+                'win_rate_pct': [round(pattern_data['win_rate'], 2) for _, pattern_data in traded],
+                'total_net_pnl': [round(pattern_data['total_net_pnl'], 2) for _, pattern_data in traded],
+                'skipped_signals': [pattern_data.get('skipped_signals', 0) for _, pattern_data in traded]
+            })
+            total_trades = sum(pattern_data['analyzed_trades'] for _, pattern_data in traded)
+            total_pnl = sum(pattern_data['total_net_pnl'] for _, pattern_data in traded)
             summary_df = summary_df.sort_values('total_net_pnl', ascending=False).reset_index(drop=True)
             summary_path = os.path.join(output_dir, 'patterns_summary.csv')
             summary_df.to_csv(summary_path, index=False)
@@ -670,162 +1266,81 @@ class IchimokuADXBacktester:
             
             # Print summary
             print(f"\n📊 BACKTEST SUMMARY:")
-            print(f"   Total Patterns with Trades: {len(summary_data)}")
+            print(f"   Total Patterns with Trades: {len(traded)}")
             print(f"   Total Trades: {total_trades}")
             print(f"   Total Net P&L: ₹{total_pnl:,.2f}")
             print(f"\n🏆 TOP 3 PATTERNS:")
             for i, row in summary_df.head(3).iterrows():
                 print(f"   {i+1}. Pattern {row['pattern_id']}: {row['pattern_name']} - ₹{row['total_net_pnl']:,.2f} ({row['total_trades']} trades)")
         
-        return output_dir
-        if self.results['all_trades']:
-            trades_data = []
-            for trade in self.results['all_trades']:
-                trades_data.append({
-                    'pattern_id': trade['pattern_id'],
-                    'pattern_name': trade['pattern_name'],
-                    'signal_time': trade['signal_time'],
-                    'signal_type': trade['signal_type'],
-                    'entry_price': trade['entry_price'],
-                    'exit_price': trade['exit_price'],
-                    'quantity': trade['quantity'],
-                    'gross_pnl': trade['gross_pnl'],
-                    'net_pnl': trade['net_pnl'],
-                    'transaction_costs': trade['transaction_costs'],
-                    'pnl_percentage': trade['pnl_percentage'],
-                    'max_profit': trade['max_profit'],
-                    'max_loss': trade['max_loss'],
-                    'total_profitable_minutes': trade['total_profitable_minutes'],
-                    'total_loss_minutes': trade['total_loss_minutes'],
-                    'exit_reason': trade['exit_reason'],
-                    'total_minutes_analyzed': trade['total_minutes_analyzed']
-                })
-            
-            trades_df = pd.DataFrame(trades_data)
-            trades_path = os.path.join(output_dir, 'detailed_trades.csv')
-            trades_df.to_csv(trades_path, index=False)
-            print(f"💾 Saved detailed trades to {trades_path}")
-        
         # Save summary text
-        summary_text_path = self.save_summary_text(output_dir)
-        
-        # Save comprehensive pattern metrics with individual capital allocation
-        pattern_capital = 100000  # ₹1 lakh per pattern
-        metrics_path, summary_path, metrics_df = self.save_pattern_metrics_csv(output_dir, pattern_capital)
+        self.save_summary_text(output_dir)
         
         # Create visualizations
         try:
-            equity_path = self.create_equity_curves(output_dir)
+            equity_paths = self.create_equity_curves(output_dir)
             dashboard_path = self.create_performance_dashboard(output_dir)
             
             print(f"📊 Created visualizations:")
-            if isinstance(equity_path, list):
-                for path in equity_path:
-                    print(f"   - Equity curve: {path}")
-            else:
-                print(f"   - Equity curves: {equity_path}")
+            for path in equity_paths:
+                print(f"   - Equity curve: {path}")
             print(f"   - Performance dashboard: {dashboard_path}")
             
         except Exception as e:
             print(f"⚠️  Warning: Could not create visualizations: {e}")
             print("   Data files were saved successfully.")
         
-        # Save advanced metrics as CSV instead of JSON
+        # Save the overall financial metrics as CSV
         if self.results['all_trades']:
-            overall_metrics = self.calculate_financial_metrics(self.results['all_trades'])
-            
-            # Create overall metrics CSV
-            overall_data = {
-                'metric': [],
-                'value': [],
-                'description': []
-            }
-            
-            metric_descriptions = {
-                'total_trades': 'Total number of trades executed',
-                'profitable_trades': 'Number of profitable trades',
-                'win_rate': 'Percentage of profitable trades',
-                'total_pnl': 'Total profit and loss amount',
-                'avg_trade': 'Average profit/loss per trade',
-                'max_trade': 'Best single trade result',
-                'min_trade': 'Worst single trade result',
-                'std_returns': 'Standard deviation of returns',
-                'sharpe_ratio': 'Risk-adjusted return measure',
-                'max_drawdown': 'Largest peak-to-trough decline',
-                'max_drawdown_pct': 'Maximum drawdown as percentage',
-                'profit_factor': 'Gross profit / Gross loss',
-                'recovery_factor': 'Total P&L / Maximum drawdown',
-                'sortino_ratio': 'Downside risk-adjusted return'
-            }
-            
-            for key, value in overall_metrics.items():
-                if key not in ['dates', 'cumulative_returns'] and key in metric_descriptions:
-                    overall_data['metric'].append(key)
-                    if isinstance(value, (np.integer, np.floating)):
-                        overall_data['value'].append(float(value))
-                    else:
-                        overall_data['value'].append(value)
-                    overall_data['description'].append(metric_descriptions[key])
-            
-            overall_df = pd.DataFrame(overall_data)
+            overall_metrics = self.pattern_financial_metrics()
+            metric_names = [name for name in OVERALL_METRIC_DESCRIPTIONS if name in overall_metrics]
+            overall_df = pd.DataFrame({
+                'metric': metric_names,
+                'value': [float(overall_metrics[name]) for name in metric_names],
+                'description': [OVERALL_METRIC_DESCRIPTIONS[name] for name in metric_names]
+            })
             overall_metrics_path = os.path.join(output_dir, 'overall_metrics.csv')
-            overall_df.to_csv(overall_metrics_path, index=False)
+            write_csv(overall_df, overall_metrics_path)
             print(f"💾 Saved overall metrics to {overall_metrics_path}")
         
-        # Save pattern-wise metrics to CSV
-        try:
-            pattern_metrics_path, pattern_summary_path, _ = self.save_pattern_metrics_csv(output_dir)
-            print(f"💾 Saved pattern-wise metrics to {pattern_metrics_path} and summary to {pattern_summary_path}")
-        except Exception as e:
-            print(f"⚠️  Warning: Could not save pattern-wise metrics: {e}")
-        
         return output_dir
-
-# End of IchimokuADXBacktester class
-        """Calculate advanced financial metrics for a set of trades"""
-        if not trades:
+    
+    def calculate_financial_metrics(self, records: np.ndarray, return_series: bool = False) -> Dict[str, Any]:
+        """
+        Calculate advanced financial metrics for a set of trades given as TRADE_RECORD_DTYPE records
+        The cumulative P&L series and its formatted dates are only included with return_series=True
+        """
+        if not len(records):
             return {}
         
-        # Extract trade P&Ls and dates
-        returns = [trade['net_pnl'] for trade in trades]
-        dates = [trade['signal_time'] for trade in trades]
-        
-        # Convert to pandas Series for easier calculation
-        returns_series = pd.Series(returns, index=pd.to_datetime(dates))
-        returns_series = returns_series.sort_index()
-        
-        # Calculate cumulative returns
-        cumulative_returns = returns_series.cumsum()
+        # Trade P&Ls and dates are columns of the records already
+        returns = records['net_pnl']
+        dates = pd.DatetimeIndex(records['signal_time'])
+        initial_value = self.INITIAL_CAPITAL
         
-        # Calculate percentage returns
-        if len(trades) > 0:
-            initial_value = self.INITIAL_CAPITAL
-            pct_returns = [(ret / initial_value) * 100 for ret in returns]
-            pct_returns_series = pd.Series(pct_returns, index=returns_series.index)
+        # Calculate cumulative returns in time order; a single pattern's trades already are,
+        # only the pattern-by-pattern concatenation of all trades needs sorting
+        if dates.is_monotonic_increasing:
+            cumulative_dates = dates
         else:
-            pct_returns = []
-            pct_returns_series = pd.Series([])
+            order = dates.argsort()
+            returns = returns[order]
+            cumulative_dates = dates[order]
         
-        # Basic metrics
-        total_trades = len(trades)
-        profitable_trades = len([t for t in trades if t['net_pnl'] > 0])
-        win_rate = (profitable_trades / total_trades * 100) if total_trades > 0 else 0
+        # Every P&L reduction, including the drawdown of the cumulative P&L, in one pass
+        (total_pnl, avg_trade, std_returns, max_trade, min_trade, max_drawdown_pnl, profitable_trades,
+         gross_profit, gross_loss, _, _, downside_std) = pnl_stats(returns)
         
-        # P&L metrics
-        total_pnl = sum(returns)
-        avg_trade = np.mean(returns) if returns else 0
-        max_trade = max(returns) if returns else 0
-        min_trade = min(returns) if returns else 0
-        
-        # Risk metrics
-        std_returns = np.std(returns) if len(returns) > 1 else 0
+        # Basic metrics; records are non-empty from here on
+        total_trades = len(records)
+        win_rate = (profitable_trades / total_trades * 100)
         
         # Sharpe ratio (assuming risk-free rate of 6% annually, adjusted for trade frequency)
         risk_free_rate = 0.06
         if len(returns) > 1 and std_returns > 0:
             # Estimate trading frequency (trades per year)
             if len(dates) > 1:
-                time_span = (max(dates) - min(dates)).days / 365.25
+                time_span = (dates.max() - dates.min()).days / 365.25
                 trades_per_year = len(returns) / time_span if time_span > 0 else len(returns)
             else:
                 trades_per_year = 252  # Default assumption
@@ -837,33 +1352,22 @@ class IchimokuADXBacktester:
         else:
             sharpe_ratio = 0
         
-        # Maximum Drawdown
-        if len(cumulative_returns) > 0:
-            running_max = cumulative_returns.expanding().max()
-            drawdown = cumulative_returns - running_max
-            max_drawdown = drawdown.min()
-            max_drawdown_pct = (max_drawdown / initial_value * 100) if initial_value > 0 else 0
-        else:
-            max_drawdown = 0
-            max_drawdown_pct = 0
+        # Maximum Drawdown from the running peak of the cumulative P&L
+        max_drawdown_pct = (max_drawdown_pnl / initial_value * 100) if initial_value > 0 else 0
         
         # Profit Factor
-        gross_profit = sum([ret for ret in returns if ret > 0])
-        gross_loss = abs(sum([ret for ret in returns if ret < 0]))
         profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf') if gross_profit > 0 else 0
         
         # Recovery Factor
-        recovery_factor = abs(total_pnl / max_drawdown) if max_drawdown != 0 else 0
+        recovery_factor = abs(total_pnl / max_drawdown_pnl) if max_drawdown_pnl != 0 else 0
         
         # Sortino Ratio (using downside deviation)
-        negative_returns = [ret for ret in returns if ret < 0]
-        downside_std = np.std(negative_returns) if len(negative_returns) > 1 else 0
         if downside_std > 0:
             sortino_ratio = excess_return / downside_std
         else:
             sortino_ratio = 0
         
-        return {
+        metrics = {
             'total_trades': total_trades,
             'profitable_trades': profitable_trades,
             'win_rate': win_rate,
@@ -873,15 +1377,167 @@ class IchimokuADXBacktester:
             'min_trade': min_trade,
             'std_returns': std_returns,
             'sharpe_ratio': sharpe_ratio,
-            'max_drawdown': max_drawdown,
+            'max_drawdown': max_drawdown_pnl,
             'max_drawdown_pct': max_drawdown_pct,
             'profit_factor': profit_factor,
             'recovery_factor': recovery_factor,
             'sortino_ratio': sortino_ratio,
             'gross_profit': gross_profit,
-            'gross_loss': gross_loss,
-            'cumulative_returns': cumulative_returns.tolist() if len(cumulative_returns) > 0 else [],
-            'dates': [d.strftime('%Y-%m-%d %H:%M:%S') for d in cumulative_returns.index] if len(cumulative_returns) > 0 else []
+            'gross_loss': gross_loss
+        }
+        if return_series:
+            metrics['cumulative_returns'] = np.cumsum(returns).tolist()
+            metrics['dates'] = cumulative_dates.strftime('%Y-%m-%d %H:%M:%S').tolist()
+        return metrics
+    
+    def pattern_financial_metrics(self, pattern_id: int = None) -> Dict[str, Any]:
+        """
+        calculate_financial_metrics of one pattern's trades, or of all trades when pattern_id is None
+        Computed once per backtest run; the dashboard and summary report reuse the same dicts
+        """
+        if pattern_id not in self._financial_metrics_cache:
+            records = (self.results['trade_records'] if pattern_id is None
+                       else self.results['pattern_results'][pattern_id]['trade_records'])
+            self._financial_metrics_cache[pattern_id] = self.calculate_financial_metrics(records)
+        return self._financial_metrics_cache[pattern_id]
+    
+    def _pattern_metrics_row(self, pattern_id: int, pattern_data: Dict, pattern_capital: float) -> Dict[str, Any]:
+        """Capital-based metrics of one pattern with trades, as one unrounded row of the pattern metrics table"""
+        trades = pattern_data['trades']
+        records = pattern_data['trade_records']
+        
+        # Net P&L of every trade in time order; all its reductions come from one compiled pass
+        returns = records['net_pnl']
+        (total_net_pnl, avg_trade_pnl, std_returns, best_trade, worst_trade, max_drawdown_pnl, profitable_trades,
+         gross_profit, gross_loss, avg_profit, avg_loss, downside_std) = pnl_stats(returns)
+        
+        # Basic metrics
+        total_trades = len(trades)
+        losing_trades = total_trades - profitable_trades
+        win_rate = (profitable_trades / total_trades * 100)
+        
+        # P&L metrics (actual trade results)
+        total_gross_pnl = records['gross_pnl'].sum()
+        
+        # Calculate percentage returns based on allocated capital
+        total_return_pct = (total_net_pnl / pattern_capital) * 100
+        avg_trade_return_pct = (avg_trade_pnl / pattern_capital) * 100
+        best_trade_pct = (best_trade / pattern_capital) * 100
+        worst_trade_pct = (worst_trade / pattern_capital) * 100
+        
+        # Profit and loss analysis
+        avg_profit_pct = (avg_profit / pattern_capital) * 100 if avg_profit > 0 else 0
+        avg_loss_pct = (avg_loss / pattern_capital) * 100 if avg_loss < 0 else 0
+        
+        # Trading timespan
+        dates = records['signal_time']
+        time_span_days = (pd.Timestamp(dates.max()) - pd.Timestamp(dates.min())).days
+        
+        # Sharpe ratio calculation
+        if len(returns) > 1 and std_returns > 0:
+            # Estimate annual risk-free rate (6%) adjusted for trading frequency
+            risk_free_annual = 6.0  # 6% annually
+            
+            # Trades per year over the trading timespan
+            trades_per_year = (total_trades / time_span_days) * 365.25 if time_span_days > 0 else total_trades
+            
+            # Risk-free return per trade as percentage of capital
+            risk_free_per_trade_pct = (risk_free_annual / trades_per_year)
+            excess_return_pct = avg_trade_return_pct - risk_free_per_trade_pct
+            
+            # Convert std_returns to percentage terms
+            std_returns_pct = (std_returns / pattern_capital) * 100
+            sharpe_ratio = excess_return_pct / std_returns_pct if std_returns_pct > 0 else 0
+        else:
+            sharpe_ratio = 0
+        
+        # Maximum Drawdown calculation
+        max_drawdown_pct = (max_drawdown_pnl / pattern_capital) * 100
+        
+        # Profit Factor
+        profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf') if gross_profit > 0 else 0
+        
+        # Recovery Factor
+        recovery_factor = abs(total_net_pnl / max_drawdown_pnl) if max_drawdown_pnl != 0 else 0
+        
+        # Sortino Ratio (downside deviation)
+        downside_std_pct = (downside_std / pattern_capital) * 100 if downside_std > 0 else 0
+        
+        if downside_std_pct > 0:
+            sortino_ratio = excess_return_pct / downside_std_pct
+        else:
+            sortino_ratio = 0
+        
+        # Trade frequency analysis
+        if len(dates) > 1:
+            trades_per_month = (total_trades / time_span_days) * 30.44 if time_span_days > 0 else 0
+        else:
+            trades_per_month = 0
+        
+        # Calmar Ratio (Annual Return / Max Drawdown)
+        if len(dates) > 1 and max_drawdown_pct < 0:
+            time_span_years = time_span_days / 365.25 if time_span_days > 0 else 1
+            annualized_return = (total_return_pct / time_span_years)
+            calmar_ratio = annualized_return / abs(max_drawdown_pct)
+        else:
+            calmar_ratio = 0
+            annualized_return = 0
+        
+        # Compile all metrics
+        return {
+            'pattern_id': pattern_id,
+            'pattern_name': pattern_data['pattern_name'],
+            'allocated_capital': pattern_capital,
+            
+            # Trade Statistics
+            'total_signals': pattern_data['total_signals'],
+            'total_trades': total_trades,
+            'skipped_signals': pattern_data.get('skipped_signals', 0),
+            'buy_signals': pattern_data['buy_signals'],
+            'sell_signals': pattern_data['sell_signals'],
+            'profitable_trades': profitable_trades,
+            'losing_trades': losing_trades,
+            'win_rate_pct': win_rate,
+            
+            # P&L Metrics (Actual Amounts)
+            'total_gross_pnl': total_gross_pnl,
+            'total_net_pnl': total_net_pnl,
+            'avg_trade_pnl': avg_trade_pnl,
+            'best_trade_pnl': best_trade,
+            'worst_trade_pnl': worst_trade,
+            'avg_profit_pnl': avg_profit,
+            'avg_loss_pnl': avg_loss,
+            
+            # Return Metrics (Percentage of Allocated Capital)
+            'total_return_pct': total_return_pct,
+            'avg_trade_return_pct': avg_trade_return_pct,
+            'best_trade_return_pct': best_trade_pct,
+            'worst_trade_return_pct': worst_trade_pct,
+            'avg_profit_return_pct': avg_profit_pct,
+            'avg_loss_return_pct': avg_loss_pct,
+            'annualized_return_pct': annualized_return,
+            
+            # Risk Metrics
+            'volatility_pct': std_returns_pct if 'std_returns_pct' in locals() else 0,
+            'max_drawdown_pnl': max_drawdown_pnl,
+            'max_drawdown_pct': max_drawdown_pct,
+            'sharpe_ratio': sharpe_ratio,
+            'sortino_ratio': sortino_ratio,
+            'calmar_ratio': calmar_ratio,
+            'profit_factor': profit_factor,
+            'recovery_factor': recovery_factor,
+            
+            # Trading Activity
+            'trades_per_month': trades_per_month,
+            'avg_holding_minutes': records['held_minutes'].mean(),
+            
+            # Performance Score (Custom metric combining multiple factors)
+            'performance_score': (
+                (win_rate * 0.3) + 
+                (total_return_pct * 0.4) + 
+                (sharpe_ratio * 10 * 0.2) + 
+                (profit_factor * 10 * 0.1)
+            )
         }
     
     def calculate_pattern_metrics_with_capital(self, pattern_capital: float = 100000) -> pd.DataFrame:
@@ -892,181 +1548,29 @@ class IchimokuADXBacktester:
             pattern_capital: Capital allocated to each pattern individually (default: ₹100,000)
         
         Returns:
-            DataFrame with comprehensive pattern-wise metrics
+            DataFrame with comprehensive pattern-wise metrics, cached per pattern_capital until the next backtest run
         """
-        print(f"📊 Calculating pattern metrics with ₹{pattern_capital:,} capital per pattern...")
+        # Reporting may ask for the same allocation more than once per backtest
+        if pattern_capital in self._pattern_metrics_cache:
+            return self._pattern_metrics_cache[pattern_capital]
         
-        pattern_metrics = []
+        print(f"📊 Calculating pattern metrics with ₹{pattern_capital:,} capital per pattern...")
         
-        for pattern_id, pattern_data in self.results['pattern_results'].items():
-            if pattern_data.get('analyzed_trades', 0) > 0:
-                trades = pattern_data['trades']
-                
-                # Basic metrics
-                total_trades = len(trades)
-                profitable_trades = len([t for t in trades if t['net_pnl'] > 0])
-                losing_trades = total_trades - profitable_trades
-                win_rate = (profitable_trades / total_trades * 100) if total_trades > 0 else 0
-                
-                # P&L metrics (actual trade results)
-                total_gross_pnl = sum([t['gross_pnl'] for t in trades])
-                total_net_pnl = sum([t['net_pnl'] for t in trades])
-                avg_trade_pnl = total_net_pnl / total_trades if total_trades > 0 else 0
-                
-                # Best and worst trades
-                best_trade = max([t['net_pnl'] for t in trades]) if trades else 0
-                worst_trade = min([t['net_pnl'] for t in trades]) if trades else 0
-                
-                # Calculate percentage returns based on allocated capital
-                total_return_pct = (total_net_pnl / pattern_capital) * 100
-                avg_trade_return_pct = (avg_trade_pnl / pattern_capital) * 100
-                best_trade_pct = (best_trade / pattern_capital) * 100
-                worst_trade_pct = (worst_trade / pattern_capital) * 100
-                
-                # Profit and loss analysis
-                profit_trades = [t['net_pnl'] for t in trades if t['net_pnl'] > 0]
-                loss_trades = [t['net_pnl'] for t in trades if t['net_pnl'] <= 0]
-                
-                avg_profit = np.mean(profit_trades) if profit_trades else 0
-                avg_loss = np.mean(loss_trades) if loss_trades else 0
-                avg_profit_pct = (avg_profit / pattern_capital) * 100 if avg_profit > 0 else 0
-                avg_loss_pct = (avg_loss / pattern_capital) * 100 if avg_loss < 0 else 0
-                
-                # Risk metrics
-                returns_list = [t['net_pnl'] for t in trades]
-                std_returns = np.std(returns_list) if len(returns_list) > 1 else 0
-                
-                # Calculate returns as percentage of allocated capital for risk metrics
-                pct_returns_list = [(ret / pattern_capital) * 100 for ret in returns_list]
-                
-                # Sharpe ratio calculation
-                if len(pct_returns_list) > 1 and std_returns > 0:
-                    # Estimate annual risk-free rate (6%) adjusted for trading frequency
-                    risk_free_annual = 6.0  # 6% annually
-                    
-                    # Get trading timespan
-                    dates = [trade['signal_time'] for trade in trades]
-                    if len(dates) > 1:
-                        time_span_days = (max(dates) - min(dates)).days
-                        trades_per_year = (total_trades / time_span_days) * 365.25 if time_span_days > 0 else total_trades
-                    else:
-                        trades_per_year = 252  # Default assumption
-                    
-                    # Risk-free return per trade as percentage of capital
-                    risk_free_per_trade_pct = (risk_free_annual / trades_per_year)
-                    excess_return_pct = avg_trade_return_pct - risk_free_per_trade_pct
-                    
-                    # Convert std_returns to percentage terms
-                    std_returns_pct = (std_returns / pattern_capital) * 100
-                    sharpe_ratio = excess_return_pct / std_returns_pct if std_returns_pct > 0 else 0
-                else:
-                    sharpe_ratio = 0
-                
-                # Maximum Drawdown calculation
-                if len(returns_list) > 0:
-                    cumulative_returns = np.cumsum(returns_list)
-                    running_max = np.maximum.accumulate(cumulative_returns)
-                    drawdown = cumulative_returns - running_max
-                    max_drawdown = np.min(drawdown)
-                    max_drawdown_pct = (max_drawdown / pattern_capital) * 100
-                else:
-                    max_drawdown = 0
-                    max_drawdown_pct = 0
-                
-                # Profit Factor
-                gross_profit = sum([ret for ret in returns_list if ret > 0])
-                gross_loss = abs(sum([ret for ret in returns_list if ret < 0]))
-                profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf') if gross_profit > 0 else 0
-                
-                # Recovery Factor
-                recovery_factor = abs(total_net_pnl / max_drawdown) if max_drawdown != 0 else 0
-                
-                # Sortino Ratio (downside deviation)
-                negative_returns = [ret for ret in returns_list if ret < 0]
-                downside_std = np.std(negative_returns) if len(negative_returns) > 1 else 0
-                downside_std_pct = (downside_std / pattern_capital) * 100 if downside_std > 0 else 0
-                
-                if downside_std_pct > 0:
-                    sortino_ratio = excess_return_pct / downside_std_pct
-                else:
-                    sortino_ratio = 0
-                
-                # Trade frequency analysis
-                if len(dates) > 1:
-                    time_span_days = (max(dates) - min(dates)).days
-                    trades_per_month = (total_trades / time_span_days) * 30.44 if time_span_days > 0 else 0
-                else:
-                    trades_per_month = 0
-                
-                # Calmar Ratio (Annual Return / Max Drawdown)
-                if len(dates) > 1 and max_drawdown_pct < 0:
-                    time_span_years = time_span_days / 365.25 if time_span_days > 0 else 1
-                    annualized_return = (total_return_pct / time_span_years)
-                    calmar_ratio = annualized_return / abs(max_drawdown_pct)
-                else:
-                    calmar_ratio = 0
-                    annualized_return = 0
-                
-                # Compile all metrics
-                pattern_metrics.append({
-                    'pattern_id': pattern_id,
-                    'pattern_name': pattern_data['pattern_name'],
-                    'allocated_capital': pattern_capital,
-                    
-                    # Trade Statistics
-                    'total_signals': pattern_data['total_signals'],
-                    'total_trades': total_trades,
-                    'skipped_signals': pattern_data.get('skipped_signals', 0),
-                    'buy_signals': pattern_data['buy_signals'],
-                    'sell_signals': pattern_data['sell_signals'],
-                    'profitable_trades': profitable_trades,
-                    'losing_trades': losing_trades,
-                    'win_rate_pct': round(win_rate, 2),
-                    
-                    # P&L Metrics (Actual Amounts)
-                    'total_gross_pnl': round(total_gross_pnl, 2),
-                    'total_net_pnl': round(total_net_pnl, 2),
-                    'avg_trade_pnl': round(avg_trade_pnl, 2),
-                    'best_trade_pnl': round(best_trade, 2),
-                    'worst_trade_pnl': round(worst_trade, 2),
-                    'avg_profit_pnl': round(avg_profit, 2),
-                    'avg_loss_pnl': round(avg_loss, 2),
-                    
-                    # Return Metrics (Percentage of Allocated Capital)
-                    'total_return_pct': round(total_return_pct, 4),
-                    'avg_trade_return_pct': round(avg_trade_return_pct, 4),
-                    'best_trade_return_pct': round(best_trade_pct, 4),
-                    'worst_trade_return_pct': round(worst_trade_pct, 4),
-                    'avg_profit_return_pct': round(avg_profit_pct, 4),
-                    'avg_loss_return_pct': round(avg_loss_pct, 4),
-                    'annualized_return_pct': round(annualized_return, 2),
-                    
-                    # Risk Metrics
-                    'volatility_pct': round(std_returns_pct, 4) if 'std_returns_pct' in locals() else 0,
-                    'max_drawdown_pnl': round(max_drawdown, 2),
-                    'max_drawdown_pct': round(max_drawdown_pct, 4),
-                    'sharpe_ratio': round(sharpe_ratio, 4),
-                    'sortino_ratio': round(sortino_ratio, 4),
-                    'calmar_ratio': round(calmar_ratio, 4),
-                    'profit_factor': round(profit_factor, 2),
-                    'recovery_factor': round(recovery_factor, 2),
-                    
-                    # Trading Activity
-                    'trades_per_month': round(trades_per_month, 2),
-                    'avg_holding_minutes': round(np.mean([len(t['minute_by_minute']) for t in trades]), 1) if trades else 0,
-                    
-                    # Performance Score (Custom metric combining multiple factors)
-                    'performance_score': round(
-                        (win_rate * 0.3) + 
-                        (total_return_pct * 0.4) + 
-                        (sharpe_ratio * 10 * 0.2) + 
-                        (profit_factor * 10 * 0.1), 2
-                    )
-                })
+        # Patterns are independent and their reductions run in NumPy, so they can share a thread pool
+        traded = [pattern_id for pattern_id, pattern_data in self.results['pattern_results'].items()
+                  if pattern_data.get('analyzed_trades', 0) > 0]
+        traded_data = [self.results['pattern_results'][pattern_id] for pattern_id in traded]
+        metrics_row = partial(self._pattern_metrics_row, pattern_capital=pattern_capital)
+        if self.MAX_WORKERS <= 1 or len(traded) <= 1:
+            pattern_metrics = list(map(metrics_row, traded, traded_data))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(traded))) as executor:
+                pattern_metrics = list(executor.map(metrics_row, traded, traded_data))
         
         # Convert to DataFrame and sort by performance score
-        df = pd.DataFrame(pattern_metrics)
+        df = pd.DataFrame(pattern_metrics).round(PATTERN_METRICS_ROUNDING)
         df = df.sort_values('performance_score', ascending=False).reset_index(drop=True)
+        self._pattern_metrics_cache[pattern_capital] = df
         return df
     
     def save_pattern_metrics_csv(self, output_dir: str, pattern_capital: float = 100000):
@@ -1077,18 +1581,12 @@ class IchimokuADXBacktester:
         
         # Save to CSV
         metrics_path = os.path.join(output_dir, 'pattern_wise_metrics.csv')
-        metrics_df.to_csv(metrics_path, index=False)
+        write_csv(metrics_df, metrics_path)
         
         # Also create a summary table with key metrics only
-        summary_columns = [
-            'pattern_id', 'pattern_name', 'total_trades', 'skipped_signals', 'win_rate_pct',
-            'total_net_pnl', 'total_return_pct', 'max_drawdown_pct',
-            'sharpe_ratio', 'profit_factor', 'performance_score'
-        ]
-        
-        summary_df = metrics_df[summary_columns].copy()
+        summary_df = metrics_df[PATTERN_SUMMARY_COLUMNS].copy()
         summary_path = os.path.join(output_dir, 'pattern_summary_metrics.csv')
-        summary_df.to_csv(summary_path, index=False)
+        write_csv(summary_df, summary_path)
         
         print(f"💾 Saved pattern metrics to {metrics_path}")
         print(f"💾 Saved pattern summary metrics to {summary_path}")
@@ -1105,31 +1603,54 @@ class IchimokuADXBacktester:
         
         return metrics_path, summary_path, metrics_df
     
+    @staticmethod
+    def _equity_curve(records: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Signal times and cumulative net P&L of TRADE_RECORD_DTYPE records in time order"""
+        signal_times = records['signal_time']
+        net_pnl = records['net_pnl']
+        if len(signal_times) > 1 and (signal_times[1:] < signal_times[:-1]).any():
+            order = np.argsort(signal_times, kind='stable')
+            signal_times, net_pnl = signal_times[order], net_pnl[order]
+        return signal_times, np.cumsum(net_pnl)
+    
+    def _plot_pattern_equity(self, ax, pattern_id: int, pattern_data: Dict, color):
+        """Draw one pattern's equity curve panel"""
+        dates, cumulative_pnl = self._equity_curve(pattern_data['trade_records'])
+        
+        ax.plot(dates, cumulative_pnl, linewidth=2, color=color, rasterized=True)
+        ax.axhline(y=0, color='red', linestyle='--', alpha=0.7)
+        ax.set_title(f'Pattern {pattern_id}: {pattern_data["pattern_name"][:25]}', fontsize=11, fontweight='bold')
+        ax.set_ylabel('P&L (₹)', fontsize=10)
+        ax.grid(True, alpha=0.3)
+        
+        # Add performance text
+        ax.text(0.02, 0.98, f'Total: ₹{pattern_data["total_net_pnl"]:,.0f}\nWin Rate: {pattern_data["win_rate"]:.1f}%', 
+               transform=ax.transAxes, fontsize=9, verticalalignment='top',
+               bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        
+        # Format x-axis
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%y'))
+        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, fontsize=9)
+    
     def create_equity_curves(self, output_dir: str):
         """Create equity curve visualizations for all patterns"""
         print("📊 Creating equity curve visualizations...")
         
         # Create figure with subplots - split into two separate figures to avoid overcrowding
+        # Curves are rasterized and saved at EQUITY_CURVE_DPI; one figure is cleared and reused for both
         
         # Figure 1: Overall equity curve and top 5 patterns
-        fig1 = plt.figure(figsize=(16, 12))
+        fig = plt.figure(figsize=(16, 12))
         
         # Overall equity curve (top plot, spans full width)
-        ax1 = plt.subplot(3, 2, (1, 2))
+        ax1 = fig.add_subplot(3, 2, (1, 2))
         
         # Combine all trades and sort by time
-        all_trades_sorted = sorted(self.results['all_trades'], key=lambda x: x['signal_time'])
-        if all_trades_sorted:
-            cumulative_pnl = []
-            dates = []
-            running_total = 0
-            
-            for trade in all_trades_sorted:
-                running_total += trade['net_pnl']
-                cumulative_pnl.append(running_total)
-                dates.append(trade['signal_time'])
+        if self.results['all_trades']:
+            all_records = self.results['trade_records']
+            dates, cumulative_pnl = self._equity_curve(all_records)
             
-            ax1.plot(dates, cumulative_pnl, linewidth=3, color='darkblue', label='Overall Strategy')
+            ax1.plot(dates, cumulative_pnl, linewidth=3, color='darkblue', label='Overall Strategy', rasterized=True)
             ax1.axhline(y=0, color='red', linestyle='--', alpha=0.7)
             ax1.set_title('Overall Strategy Equity Curve', fontsize=16, fontweight='bold')
             ax1.set_ylabel('Cumulative P&L (₹)', fontsize=12)
@@ -1142,88 +1663,38 @@ class IchimokuADXBacktester:
             plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
         
         # Top 5 performing patterns (by P&L)
-        patterns_with_trades = [(k, v) for k, v in self.results['pattern_results'].items() 
-                               if v.get('trades', [])]
-        top_patterns = sorted(patterns_with_trades, key=lambda x: x[1]['total_net_pnl'], reverse=True)[:4]
+        # Rank once; the second figure continues from the same order
+        ranked_patterns = self._ranked_patterns()
+        top_patterns = ranked_patterns[:4]
         
         colors = ['#2E8B57', '#FF6347', '#4682B4', '#DAA520']  # Nice colors for top patterns
         
         for i, (pattern_id, pattern_data) in enumerate(top_patterns):
-            ax = plt.subplot(3, 2, i + 3)
-            
-            trades = sorted(pattern_data['trades'], key=lambda x: x['signal_time'])
-            cumulative_pnl = []
-            dates = []
-            running_total = 0
-            
-            for trade in trades:
-                running_total += trade['net_pnl']
-                cumulative_pnl.append(running_total)
-                dates.append(trade['signal_time'])
-            
-            ax.plot(dates, cumulative_pnl, linewidth=2, color=colors[i])
-            ax.axhline(y=0, color='red', linestyle='--', alpha=0.7)
-            ax.set_title(f'Pattern {pattern_id}: {pattern_data["pattern_name"][:25]}', fontsize=11, fontweight='bold')
-            ax.set_ylabel('P&L (₹)', fontsize=10)
-            ax.grid(True, alpha=0.3)
-            
-            # Add performance text
-            ax.text(0.02, 0.98, f'Total: ₹{pattern_data["total_net_pnl"]:,.0f}\nWin Rate: {pattern_data["win_rate"]:.1f}%', 
-                   transform=ax.transAxes, fontsize=9, verticalalignment='top',
-                   bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-            
-            # Format x-axis
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%y'))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, fontsize=9)
+            self._plot_pattern_equity(fig.add_subplot(3, 2, i + 3), pattern_id, pattern_data, colors[i])
         
-        plt.tight_layout()
+        fig.tight_layout()
         equity_path1 = os.path.join(output_dir, 'equity_curves_main.png')
-        plt.savefig(equity_path1, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(equity_path1, dpi=self.EQUITY_CURVE_DPI, bbox_inches='tight')
         
         # Figure 2: Remaining patterns
-        if len(patterns_with_trades) > 4:
-            fig2 = plt.figure(figsize=(16, 12))
-            remaining_patterns = patterns_with_trades[4:]  # Skip the top 4 already shown
+        if len(ranked_patterns) > 4:
+            fig.clf()
+            remaining_patterns = ranked_patterns[4:10]  # Skip the top 4 already shown, up to 6 more
             
-            # Show up to 6 more patterns
-            for i, (pattern_id, pattern_data) in enumerate(remaining_patterns[:6]):
-                ax = plt.subplot(3, 2, i + 1)
-                
-                trades = sorted(pattern_data['trades'], key=lambda x: x['signal_time'])
-                cumulative_pnl = []
-                dates = []
-                running_total = 0
-                
-                for trade in trades:
-                    running_total += trade['net_pnl']
-                    cumulative_pnl.append(running_total)
-                    dates.append(trade['signal_time'])
-                
-                color = plt.cm.tab10(i)
-                ax.plot(dates, cumulative_pnl, linewidth=2, color=color)
-                ax.axhline(y=0, color='red', linestyle='--', alpha=0.7)
-                ax.set_title(f'Pattern {pattern_id}: {pattern_data["pattern_name"][:25]}', fontsize=11, fontweight='bold')
-                ax.set_ylabel('P&L (₹)', fontsize=10)
-                ax.grid(True, alpha=0.3)
-                
-                # Add performance text
-                ax.text(0.02, 0.98, f'Total: ₹{pattern_data["total_net_pnl"]:,.0f}\nWin Rate: {pattern_data["win_rate"]:.1f}%', 
-                       transform=ax.transAxes, fontsize=9, verticalalignment='top',
-                       bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-                
-                # Format x-axis
-                ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%y'))
-                plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, fontsize=9)
+            # One colormap evaluation for all the panels
+            remaining_colors = plt.cm.tab10(np.arange(len(remaining_patterns)))
+            for i, (pattern_id, pattern_data) in enumerate(remaining_patterns):
+                self._plot_pattern_equity(fig.add_subplot(3, 2, i + 1), pattern_id, pattern_data, remaining_colors[i])
             
-            plt.tight_layout()
+            fig.tight_layout()
             equity_path2 = os.path.join(output_dir, 'equity_curves_additional.png')
-            plt.savefig(equity_path2, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig.savefig(equity_path2, dpi=self.EQUITY_CURVE_DPI, bbox_inches='tight')
+            plt.close(fig)
             
             print(f"💾 Saved equity curves to {equity_path1} and {equity_path2}")
             return [equity_path1, equity_path2]
         else:
+            plt.close(fig)
             print(f"💾 Saved equity curves to {equity_path1}")
             return [equity_path1]
     
@@ -1231,7 +1702,14 @@ class IchimokuADXBacktester:
         """Create comprehensive performance dashboard"""
         print("📊 Creating performance dashboard...")
         
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+        # The dashboard Figure and its axes are built once per backtester and cleared on every redraw,
+        # outside pyplot's figure manager so repeated runs don't accumulate open figures
+        if self._dashboard_figure is None:
+            fig = Figure(figsize=(18, 12))
+            self._dashboard_figure = fig, fig.subplots(2, 3)
+        fig, axes = self._dashboard_figure
+        for ax in axes.flat:
+            ax.clear()
         fig.suptitle('Trading Strategy Performance Dashboard', fontsize=16, fontweight='bold')
         
         # 1. Win Rate by Pattern
@@ -1251,15 +1729,13 @@ class IchimokuADXBacktester:
             ax1.grid(True, alpha=0.3)
             
             # Add value labels on bars
-            for bar, rate in zip(bars, win_rates):
-                ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1, 
-                        f'{rate:.1f}%', ha='center', va='bottom', fontsize=9)
+            ax1.bar_label(bars, labels=[f'{rate:.1f}%' for rate in win_rates], padding=3, fontsize=9)
         
         # 2. P&L by Pattern
         ax2 = axes[0, 1]
         if patterns_with_trades:
             pnl_values = [v['total_net_pnl'] for k, v in patterns_with_trades]
-            colors = ['green' if pnl > 0 else 'red' for pnl in pnl_values]
+            colors = np.where(np.array(pnl_values) > 0, 'green', 'red')
             
             bars = ax2.bar(pattern_names, pnl_values, color=colors, alpha=0.7)
             ax2.set_title('Net P&L by Pattern (₹)', fontweight='bold')
@@ -1267,11 +1743,8 @@ class IchimokuADXBacktester:
             ax2.axhline(y=0, color='black', linestyle='-', alpha=0.8)
             ax2.grid(True, alpha=0.3)
             
-            # Add value labels on bars
-            for bar, pnl in zip(bars, pnl_values):
-                ax2.text(bar.get_x() + bar.get_width()/2, 
-                        bar.get_height() + (max(pnl_values) * 0.01) if pnl > 0 else bar.get_height() - (max(pnl_values) * 0.01), 
-                        f'₹{pnl:,.0f}', ha='center', va='bottom' if pnl > 0 else 'top', fontsize=8)
+            # Add value labels on bars, past the bar end on either side of zero
+            ax2.bar_label(bars, labels=[f'₹{pnl:,.0f}' for pnl in pnl_values], padding=2, fontsize=8)
         
         # 3. Trade Distribution
         ax3 = axes[0, 2]
@@ -1283,12 +1756,13 @@ class IchimokuADXBacktester:
         # 4. Monthly P&L
         ax4 = axes[1, 0]
         if self.results['all_trades']:
-            trades_df = pd.DataFrame(self.results['all_trades'])
-            trades_df['signal_time'] = pd.to_datetime(trades_df['signal_time'])
-            trades_df['month'] = trades_df['signal_time'].dt.to_period('M')
-            monthly_pnl = trades_df.groupby('month')['net_pnl'].sum()
+            # Truncate the record timestamps to months and sum P&L per month key, no Period objects
+            all_records = self.results['trade_records']
+            months, month_index = np.unique(all_records['signal_time'].astype('datetime64[M]'), return_inverse=True)
+            monthly_pnl = pd.Series(np.bincount(month_index, weights=all_records['net_pnl'], minlength=len(months)),
+                                    index=np.datetime_as_string(months, unit='M'))
             
-            colors = ['green' if pnl > 0 else 'red' for pnl in monthly_pnl.values]
+            colors = np.where(monthly_pnl.values > 0, 'green', 'red')
             ax4.bar(range(len(monthly_pnl)), monthly_pnl.values, color=colors, alpha=0.7)
             ax4.set_title('Monthly P&L', fontweight='bold')
             ax4.set_ylabel('P&L (₹)')
@@ -1297,17 +1771,17 @@ class IchimokuADXBacktester:
             
             # Set x-axis labels
             ax4.set_xticks(range(len(monthly_pnl)))
-            ax4.set_xticklabels([str(m) for m in monthly_pnl.index], rotation=45)
+            ax4.set_xticklabels(monthly_pnl.index, rotation=45)
         
         # 5. Sharpe Ratio by Pattern
         ax5 = axes[1, 1]
         if patterns_with_trades:
             sharpe_ratios = []
             for k, v in patterns_with_trades:
-                metrics = self.calculate_financial_metrics(v['trades'])
+                metrics = self.pattern_financial_metrics(k)
                 sharpe_ratios.append(metrics.get('sharpe_ratio', 0))
             
-            colors = plt.cm.RdYlGn(np.array([max(0, min(2, s + 1)) / 2 for s in sharpe_ratios]))
+            colors = plt.cm.RdYlGn(np.clip(np.array(sharpe_ratios) + 1, 0, 2) / 2)
             bars = ax5.bar(pattern_names, sharpe_ratios, color=colors)
             ax5.set_title('Sharpe Ratio by Pattern', fontweight='bold')
             ax5.set_ylabel('Sharpe Ratio')
@@ -1315,20 +1789,17 @@ class IchimokuADXBacktester:
             ax5.grid(True, alpha=0.3)
             
             # Add value labels on bars
-            for bar, ratio in zip(bars, sharpe_ratios):
-                ax5.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05 if ratio > 0 else bar.get_height() - 0.05, 
-                        f'{ratio:.2f}', ha='center', va='bottom' if ratio > 0 else 'top', fontsize=9)
+            ax5.bar_label(bars, labels=[f'{ratio:.2f}' for ratio in sharpe_ratios], padding=3, fontsize=9)
         
         # 6. Drawdown Analysis
         ax6 = axes[1, 2]
         if self.results['all_trades']:
-            overall_metrics = self.calculate_financial_metrics(self.results['all_trades'])
-            if overall_metrics.get('cumulative_returns'):
-                cumulative = np.array(overall_metrics['cumulative_returns'])
+            # Drawdown straight from the equity curve arrays, no metrics dict or date strings
+            dates, cumulative = self._equity_curve(self.results['trade_records'])
+            if len(cumulative):
                 running_max = np.maximum.accumulate(cumulative)
                 drawdown = cumulative - running_max
                 
-                dates = pd.to_datetime(overall_metrics['dates'])
                 ax6.fill_between(dates, drawdown, 0, color='red', alpha=0.3)
                 ax6.plot(dates, drawdown, color='red', linewidth=1)
                 ax6.set_title('Strategy Drawdown', fontweight='bold')
@@ -1339,10 +1810,9 @@ class IchimokuADXBacktester:
                 ax6.xaxis.set_major_formatter(mdates.DateFormatter('%m/%y'))
                 plt.setp(ax6.xaxis.get_majorticklabels(), rotation=45)
         
-        plt.tight_layout()
+        fig.tight_layout()
         dashboard_path = os.path.join(output_dir, 'performance_dashboard.png')
-        plt.savefig(dashboard_path, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(dashboard_path, dpi=300, bbox_inches='tight')
         print(f"💾 Saved performance dashboard to {dashboard_path}")
         
         return dashboard_path
@@ -1352,44 +1822,45 @@ class IchimokuADXBacktester:
         if not self.results:
             return "❌ No results to display. Run backtest first."
         
-        summary = StringIO()
+        # Lines are collected and joined once at the end
+        summary = []
         
         # Header
-        summary.write("=" * 80 + "\n")
-        summary.write("📊 COMPREHENSIVE BACKTEST RESULTS SUMMARY\n")
-        summary.write("=" * 80 + "\n")
+        summary.append("=" * 80 + "\n")
+        summary.append("📊 COMPREHENSIVE BACKTEST RESULTS SUMMARY\n")
+        summary.append("=" * 80 + "\n")
         
         # Overall performance
         overall = self.results['overall_stats']
-        summary.write(f"\n🎯 OVERALL PERFORMANCE:\n")
-        summary.write(f"   Total Trades: {overall['total_trades']}\n")
-        summary.write(f"   Profitable Trades: {overall['profitable_trades']}\n")
-        summary.write(f"   Losing Trades: {overall['losing_trades']}\n")
-        summary.write(f"   Skipped Signals: {overall.get('total_skipped_signals', 0)}\n")
-        summary.write(f"   Win Rate: {overall['overall_win_rate']:.2f}%\n")
-        summary.write(f"   Total Quantity Traded: {overall['total_quantity_traded']} units\n")
-        summary.write(f"   Total Net P&L: ₹{overall['total_net_pnl']:,.2f}\n")
-        summary.write(f"   Total Gross P&L: ₹{overall['total_gross_pnl']:,.2f}\n")
-        summary.write(f"   Total Transaction Costs: ₹{overall['total_transaction_costs']:,.2f}\n")
+        summary.append(f"\n🎯 OVERALL PERFORMANCE:\n")
+        summary.append(f"   Total Trades: {overall['total_trades']}\n")
+        summary.append(f"   Profitable Trades: {overall['profitable_trades']}\n")
+        summary.append(f"   Losing Trades: {overall['losing_trades']}\n")
+        summary.append(f"   Skipped Signals: {overall.get('total_skipped_signals', 0)}\n")
+        summary.append(f"   Win Rate: {overall['overall_win_rate']:.2f}%\n")
+        summary.append(f"   Total Quantity Traded: {overall['total_quantity_traded']} units\n")
+        summary.append(f"   Total Net P&L: ₹{overall['total_net_pnl']:,.2f}\n")
+        summary.append(f"   Total Gross P&L: ₹{overall['total_gross_pnl']:,.2f}\n")
+        summary.append(f"   Total Transaction Costs: ₹{overall['total_transaction_costs']:,.2f}\n")
         
         # Advanced metrics
         if self.results['all_trades']:
-            overall_metrics = self.calculate_financial_metrics(self.results['all_trades'])
-            summary.write(f"\n📈 ADVANCED METRICS:\n")
-            summary.write(f"   Average Trade: ₹{overall_metrics['avg_trade']:,.2f}\n")
-            summary.write(f"   Best Trade: ₹{overall_metrics['max_trade']:,.2f}\n")
-            summary.write(f"   Worst Trade: ₹{overall_metrics['min_trade']:,.2f}\n")
-            summary.write(f"   Sharpe Ratio: {overall_metrics['sharpe_ratio']:.3f}\n")
-            summary.write(f"   Sortino Ratio: {overall_metrics['sortino_ratio']:.3f}\n")
-            summary.write(f"   Profit Factor: {overall_metrics['profit_factor']:.2f}\n")
-            summary.write(f"   Maximum Drawdown: ₹{overall_metrics['max_drawdown']:,.2f} ({overall_metrics['max_drawdown_pct']:.2f}%)\n")
-            summary.write(f"   Recovery Factor: {overall_metrics['recovery_factor']:.2f}\n")
+            overall_metrics = self.pattern_financial_metrics()
+            summary.append(f"\n📈 ADVANCED METRICS:\n")
+            summary.append(f"   Average Trade: ₹{overall_metrics['avg_trade']:,.2f}\n")
+            summary.append(f"   Best Trade: ₹{overall_metrics['max_trade']:,.2f}\n")
+            summary.append(f"   Worst Trade: ₹{overall_metrics['min_trade']:,.2f}\n")
+            summary.append(f"   Sharpe Ratio: {overall_metrics['sharpe_ratio']:.3f}\n")
+            summary.append(f"   Sortino Ratio: {overall_metrics['sortino_ratio']:.3f}\n")
+            summary.append(f"   Profit Factor: {overall_metrics['profit_factor']:.2f}\n")
+            summary.append(f"   Maximum Drawdown: ₹{overall_metrics['max_drawdown']:,.2f} ({overall_metrics['max_drawdown_pct']:.2f}%)\n")
+            summary.append(f"   Recovery Factor: {overall_metrics['recovery_factor']:.2f}\n")
         
         # Pattern breakdown
-        summary.write(f"\n📈 PATTERN BREAKDOWN:\n")
-        summary.write("-" * 105 + "\n")
-        summary.write(f"{'Pattern':<5} {'Name':<30} {'Signals':<8} {'Trades':<7} {'Skipped':<8} {'Win%':<6} {'Net P&L':<12} {'Sharpe':<8}\n")
-        summary.write("-" * 105 + "\n")
+        summary.append(f"\n📈 PATTERN BREAKDOWN:\n")
+        summary.append("-" * 105 + "\n")
+        summary.append(f"{'Pattern':<5} {'Name':<30} {'Signals':<8} {'Trades':<7} {'Skipped':<8} {'Win%':<6} {'Net P&L':<12} {'Sharpe':<8}\n")
+        summary.append("-" * 105 + "\n")
         
         for pattern_id, pattern_data in self.results['pattern_results'].items():
             if pattern_data.get('analyzed_trades', 0) > 0:
@@ -1401,62 +1872,56 @@ class IchimokuADXBacktester:
                 pnl = pattern_data['total_net_pnl']
                 
                 # Calculate pattern-specific metrics
-                pattern_metrics = self.calculate_financial_metrics(pattern_data['trades'])
+                pattern_metrics = self.pattern_financial_metrics(pattern_id)
                 sharpe = pattern_metrics.get('sharpe_ratio', 0)
                 
-                summary.write(f"{pattern_id:<5} {name:<30} {signals:<8} {trades:<7} {skipped:<8} {win_rate:<6.1f} ₹{pnl:<11.2f} {sharpe:<8.3f}\n")
+                summary.append(f"{pattern_id:<5} {name:<30} {signals:<8} {trades:<7} {skipped:<8} {win_rate:<6.1f} ₹{pnl:<11.2f} {sharpe:<8.3f}\n")
         
         # Top performing patterns
-        summary.write("\n🔍 TOP PERFORMING PATTERNS:\n")
-        sorted_patterns = sorted(
-            [(k, v) for k, v in self.results['pattern_results'].items() if v.get('analyzed_trades', 0) > 0],
-            key=lambda x: x[1]['total_net_pnl'],
-            reverse=True
-        )
-        
-        for i, (pattern_id, data) in enumerate(sorted_patterns[:5]):
-            pattern_metrics = self.calculate_financial_metrics(data['trades'])
-            summary.write(f"   {i+1}. Pattern {pattern_id} ({data['pattern_name']}): ₹{data['total_net_pnl']:,.2f} net P&L, "
+        summary.append("\n🔍 TOP PERFORMING PATTERNS:\n")
+        for i, (pattern_id, data) in enumerate(self._ranked_patterns()[:5]):
+            pattern_metrics = self.pattern_financial_metrics(pattern_id)
+            summary.append(f"   {i+1}. Pattern {pattern_id} ({data['pattern_name']}): ₹{data['total_net_pnl']:,.2f} net P&L, "
                          f"Sharpe: {pattern_metrics.get('sharpe_ratio', 0):.3f}\n")
         
         # Detailed trade examples
-        summary.write(f"\n💡 DETAILED TRADE EXAMPLES:\n")
-        summary.write("-" * 90 + "\n")
-        summary.write(f"{'Pattern':<8} {'Type':<5} {'Entry':<10} {'Exit':<10} {'P&L':<12} {'Reason':<12}\n")
-        summary.write("-" * 90 + "\n")
+        summary.append(f"\n💡 DETAILED TRADE EXAMPLES:\n")
+        summary.append("-" * 90 + "\n")
+        summary.append(f"{'Pattern':<8} {'Type':<5} {'Entry':<10} {'Exit':<10} {'P&L':<12} {'Reason':<12}\n")
+        summary.append("-" * 90 + "\n")
         
         for pattern_id, pattern_data in self.results['pattern_results'].items():
             trades = pattern_data.get('trades', [])
             if trades:
-                profit_trades = [t for t in trades if t['net_pnl'] > 0]
-                loss_trades = [t for t in trades if t['net_pnl'] <= 0]
+                # First winning and first losing trade, located on the P&L column
+                profit_mask = pattern_data['trade_records']['net_pnl'] > 0
                 
-                if profit_trades:
-                    trade = profit_trades[0]
-                    summary.write(f"{pattern_id:<8} {trade['signal_type']:<5} {trade['entry_price']:<10.2f} "
+                if profit_mask.any():
+                    trade = trades[int(profit_mask.argmax())]
+                    summary.append(f"{pattern_id:<8} {trade['signal_type']:<5} {trade['entry_price']:<10.2f} "
                                 f"{trade['exit_price']:<10.2f} ₹{trade['net_pnl']:<11.2f} {trade['exit_reason'] or 'Timeout':<12}\n")
                 
-                if loss_trades:
-                    trade = loss_trades[0]
-                    summary.write(f"{pattern_id:<8} {trade['signal_type']:<5} {trade['entry_price']:<10.2f} "
+                if not profit_mask.all():
+                    trade = trades[int(profit_mask.argmin())]
+                    summary.append(f"{pattern_id:<8} {trade['signal_type']:<5} {trade['entry_price']:<10.2f} "
                                 f"{trade['exit_price']:<10.2f} ₹{trade['net_pnl']:<11.2f} {trade['exit_reason'] or 'Timeout':<12}\n")
         
         # Configuration info
-        summary.write(f"\n⚙️ CONFIGURATION:\n")
+        summary.append(f"\n⚙️ CONFIGURATION:\n")
         config = self.results['config']
-        summary.write(f"   Timeframe: {config['timeframe']}\n")
-        summary.write(f"   Period: {config['start_date']} to {config['end_date']}\n")
-        summary.write(f"   Symbol: {config['symbol']}\n")
-        summary.write(f"   Initial Capital: ₹{config['initial_capital']:,}\n")
-        summary.write(f"   Quantity per Trade: {getattr(self, 'QUANTITY', 1)}\n")
-        summary.write(f"   Stop Loss: {getattr(self, 'STOP_LOSS_PCT', 0.01)*100:.1f}%\n")
-        summary.write(f"   Take Profit: {getattr(self, 'TAKE_PROFIT_PCT', 0.015)*100:.1f}%\n")
-        summary.write(f"   Transaction Cost: {getattr(self, 'TRANSACTION_COST', 0)*100:.1f}%\n")
+        summary.append(f"   Timeframe: {config['timeframe']}\n")
+        summary.append(f"   Period: {config['start_date']} to {config['end_date']}\n")
+        summary.append(f"   Symbol: {config['symbol']}\n")
+        summary.append(f"   Initial Capital: ₹{config['initial_capital']:,}\n")
+        summary.append(f"   Quantity per Trade: {config['quantity']}\n")
+        summary.append(f"   Stop Loss: {config['stop_loss_pct']*100:.1f}%\n")
+        summary.append(f"   Take Profit: {config['take_profit_pct']*100:.1f}%\n")
+        summary.append(f"   Transaction Cost: {config['transaction_cost_pct']*100:.1f}%\n")
         
         # Timestamp
-        summary.write(f"\n⏰ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        summary.append(f"\n⏰ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         
-        return summary.getvalue()
+        return ''.join(summary)
     
     def save_summary_text(self, output_dir: str):
         """Save the summary text to a file"""
@@ -1471,6 +1936,44 @@ class IchimokuADXBacktester:
         return summary_path
 
 
+def run_complete_backtest(signals_file: str = None,
+                          symbol: str = SYMBOL,
+                          start_date: str = START_DATE,
+                          end_date: str = END_DATE,
+                          initial_capital: float = INITIAL_CAPITAL,
+                          position_size: float = POSITION_SIZE,
+                          signals_df: Optional[pd.DataFrame] = None) -> Tuple['IchimokuADXBacktester', Dict[str, Any]]:
+    """
+    Run one backtest with the given period, symbol and capital on top of the config defaults
+    signals_df, when given, is used instead of reading signals_file so scenarios share one load
+
+    Returns (backtester, metrics): the overall financial metrics plus the scenario comparison
+    figures (labelled keys such as 'Total Return (%)'), empty when no trades were taken
+    """
+    backtester = IchimokuADXBacktester()
+    if signals_file is not None:
+        backtester.CSV_PATH = signals_file
+    backtester.SYMBOL = symbol
+    backtester.START_DATE = start_date
+    backtester.END_DATE = end_date
+    backtester.INITIAL_CAPITAL = initial_capital
+    backtester.POSITION_SIZE = position_size
+    
+    backtester.run_comprehensive_backtest(signals_df)
+    metrics = dict(backtester.pattern_financial_metrics())
+    if metrics:
+        metrics.update({
+            'Total Return (%)': metrics['total_pnl'] / initial_capital * 100,
+            'Sharpe Ratio': metrics['sharpe_ratio'],
+            'Maximum Drawdown (%)': metrics['max_drawdown_pct'],
+            'Win Rate (%)': metrics['win_rate'],
+            'Total Trades': metrics['total_trades'],
+            'Profit Factor': metrics['profit_factor'],
+            'Final Portfolio Value': initial_capital + metrics['total_pnl']
+        })
+    return backtester, metrics
+
+
 def main():
     """Main function to run the backtesting system"""
     
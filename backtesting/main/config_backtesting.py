@@ -29,12 +29,16 @@ TAKE_PROFIT_PCT = 0.015       # Take profit percentage (0.015 = 1.5%)
 # Analysis Parameters
 MIN_HOLDING_MINUTES = 1       # Minimum holding period in minutes
 MAX_HOLDING_MINUTES = 60      # Maximum holding period to analyze
+MAX_WORKERS = 4               # Patterns analyzed concurrently (1 = sequential)
+SCAN_IN_CLICKHOUSE = False    # Compute trade exits with one SQL aggregation instead of scanning cached bars (ignored with SAVE_MINUTE_DETAIL)
 
 # Output Configuration
 OUTPUT_DIR = "../results"        # Base directory to save results
 BACKTEST_NAME = "5min_full_backtest"  # Name for this backtest run (creates subfolder)
-SAVE_DETAILED_TRADES = True   # Save minute-by-minute trade analysis
+SAVE_MINUTE_DETAIL = False    # Keep per-minute P&L records for every trade (memory heavy)
 SAVE_PATTERN_SUMMARY = True   # Save pattern performance summary
+RESULTS_FORMAT = "csv"        # Trade tables: "csv" or "parquet" (zstd, needs pyarrow)
+EQUITY_CURVE_DPI = 150        # Resolution of the equity curve PNGs
 
 # Available CSV Files (uncomment the one you want to use):
 # CSV_PATH = "data/ichimoku_adx_wilder_signals_1min.csv"
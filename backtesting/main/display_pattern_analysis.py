@@ -3,9 +3,28 @@
 Display comprehensive pattern-wise metrics in a readable format
 """
 
+import numpy as np
 import pandas as pd
 import os
 
+# pyarrow is optional - its CSV reader parses the metrics file in C++
+try:
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+def top_rows(values, k=3):
+    """
+    Positions of the k largest values, largest first, ties in row order (as DataFrame.nlargest)
+    argpartition finds the k-th value in O(N), only the candidates at or above it get sorted
+    """
+    if values.shape[0] <= k:
+        candidates = np.arange(values.shape[0])
+    else:
+        kth_value = values[np.argpartition(values, -k)[-k]]
+        candidates = np.flatnonzero(values >= kth_value)
+    return candidates[np.argsort(-values[candidates], kind='stable')[:k]]
+
 def display_pattern_metrics():
     """Display pattern metrics in formatted tables"""
     
@@ -16,7 +35,10 @@ def display_pattern_metrics():
         print("❌ Pattern metrics file not found. Please run generate_pattern_metrics.py first.")
         return
     
-    df = pd.read_csv(metrics_file)
+    if pa_csv is not None:
+        df = pa_csv.read_csv(metrics_file).to_pandas()
+    else:
+        df = pd.read_csv(metrics_file)
     
     print("📊 ICHIMOKU-ADX PATTERN ANALYSIS")
     print("═" * 80)
@@ -31,11 +53,14 @@ def display_pattern_metrics():
     print(f"{'Rank':<4} {'ID':<3} {'Pattern Name':<35} {'Trades':<7} {'Win%':<6} {'P&L (₹)':<12} {'Return%':<8} {'Sharpe':<7} {'Score':<6}")
     print("-" * 120)
     
-    for i, row in df.iterrows():
-        print(f"{i+1:<4} {row['pattern_id']:<3} {row['pattern_name'][:33]:<35} "
-              f"{row['total_trades']:<7} {row['win_rate_pct']:<6.1f} "
-              f"{row['total_net_pnl']:>11,.0f} {row['total_return_pct']:<8.2f} "
-              f"{row['sharpe_ratio']:<7.3f} {row['performance_score']:<6.1f}")
+    # Rows come from itertuples / zipped columns, never an iterrows Series; each table is one print
+    print("\n".join(
+        f"{row.Index+1:<4} {row.pattern_id:<3} {row.pattern_name[:33]:<35} "
+        f"{row.total_trades:<7} {row.win_rate_pct:<6.1f} "
+        f"{row.total_net_pnl:>11,.0f} {row.total_return_pct:<8.2f} "
+        f"{row.sharpe_ratio:<7.3f} {row.performance_score:<6.1f}"
+        for row in df.itertuples()
+    ))
     
     # Risk Analysis
     print("\n🛡️ RISK ANALYSIS")
@@ -43,10 +68,12 @@ def display_pattern_metrics():
     print(f"{'Pattern':<3} {'Max Drawdown':<13} {'Volatility':<11} {'Profit Factor':<13} {'Recovery Factor':<15}")
     print("-" * 80)
     
-    for _, row in df.iterrows():
-        print(f"{row['pattern_id']:<3} {row['max_drawdown_pct']:>11.2f}% "
-              f"{row['volatility_pct']:>9.4f}% {row['profit_factor']:>11.2f} "
-              f"{row['recovery_factor']:>13.2f}")
+    print("\n".join(
+        f"{row.pattern_id:<3} {row.max_drawdown_pct:>11.2f}% "
+        f"{row.volatility_pct:>9.4f}% {row.profit_factor:>11.2f} "
+        f"{row.recovery_factor:>13.2f}"
+        for row in df.itertuples()
+    ))
     
     # Trading Activity Analysis
     print("\n📊 TRADING ACTIVITY")
@@ -54,11 +81,12 @@ def display_pattern_metrics():
     print(f"{'Pattern':<3} {'Signals':<8} {'Trades/Month':<12} {'Avg Hold (min)':<14} {'Buy/Sell Split':<15}")
     print("-" * 80)
     
-    for _, row in df.iterrows():
-        buy_sell_ratio = f"{row['buy_signals']}/{row['sell_signals']}"
-        print(f"{row['pattern_id']:<3} {row['total_signals']:<8} "
-              f"{row['trades_per_month']:>10.1f} {row['avg_holding_minutes']:>12.1f} "
-              f"{buy_sell_ratio:>13}")
+    print("\n".join(
+        f"{row.pattern_id:<3} {row.total_signals:<8} "
+        f"{row.trades_per_month:>10.1f} {row.avg_holding_minutes:>12.1f} "
+        f"{f'{row.buy_signals}/{row.sell_signals}':>13}"
+        for row in df.itertuples()
+    ))
     
     # Best and Worst Trade Analysis
     print("\n🎯 TRADE EXTREMES")
@@ -66,38 +94,40 @@ def display_pattern_metrics():
     print(f"{'Pattern':<3} {'Best Trade (₹)':<13} {'Best %':<8} {'Worst Trade (₹)':<15} {'Worst %':<8}")
     print("-" * 80)
     
-    for _, row in df.iterrows():
-        print(f"{row['pattern_id']:<3} {row['best_trade_pnl']:>11,.0f} "
-              f"{row['best_trade_return_pct']:>6.3f}% "
-              f"{row['worst_trade_pnl']:>13,.0f} {row['worst_trade_return_pct']:>6.3f}%")
+    print("\n".join(
+        f"{row.pattern_id:<3} {row.best_trade_pnl:>11,.0f} "
+        f"{row.best_trade_return_pct:>6.3f}% "
+        f"{row.worst_trade_pnl:>13,.0f} {row.worst_trade_return_pct:>6.3f}%"
+        for row in df.itertuples()
+    ))
     
     # Top Performers by Different Metrics
     print("\n🏆 TOP PERFORMERS BY CATEGORY")
     print("-" * 60)
     
     # Best by Return
-    best_return = df.nlargest(3, 'total_return_pct')
+    best_return = df.iloc[top_rows(df['total_return_pct'].to_numpy())]
     print("💰 Highest Returns:")
-    for i, (_, row) in enumerate(best_return.iterrows()):
-        print(f"   {i+1}. Pattern {row['pattern_id']} ({row['pattern_name'][:30]}): {row['total_return_pct']:.2f}%")
+    for i, (pattern_id, pattern_name, value) in enumerate(zip(best_return['pattern_id'], best_return['pattern_name'], best_return['total_return_pct'])):
+        print(f"   {i+1}. Pattern {pattern_id} ({pattern_name[:30]}): {value:.2f}%")
     
     # Best by Sharpe Ratio
-    best_sharpe = df.nlargest(3, 'sharpe_ratio')
+    best_sharpe = df.iloc[top_rows(df['sharpe_ratio'].to_numpy())]
     print("\n📊 Best Risk-Adjusted Returns (Sharpe):")
-    for i, (_, row) in enumerate(best_sharpe.iterrows()):
-        print(f"   {i+1}. Pattern {row['pattern_id']} ({row['pattern_name'][:30]}): {row['sharpe_ratio']:.3f}")
+    for i, (pattern_id, pattern_name, value) in enumerate(zip(best_sharpe['pattern_id'], best_sharpe['pattern_name'], best_sharpe['sharpe_ratio'])):
+        print(f"   {i+1}. Pattern {pattern_id} ({pattern_name[:30]}): {value:.3f}")
     
     # Most Active
-    most_active = df.nlargest(3, 'total_trades')
+    most_active = df.iloc[top_rows(df['total_trades'].to_numpy())]
     print("\n⚡ Most Active Patterns:")
-    for i, (_, row) in enumerate(most_active.iterrows()):
-        print(f"   {i+1}. Pattern {row['pattern_id']} ({row['pattern_name'][:30]}): {row['total_trades']:,} trades")
+    for i, (pattern_id, pattern_name, value) in enumerate(zip(most_active['pattern_id'], most_active['pattern_name'], most_active['total_trades'])):
+        print(f"   {i+1}. Pattern {pattern_id} ({pattern_name[:30]}): {value:,} trades")
     
     # Highest Win Rate
-    best_winrate = df.nlargest(3, 'win_rate_pct')
+    best_winrate = df.iloc[top_rows(df['win_rate_pct'].to_numpy())]
     print("\n🎯 Highest Win Rates:")
-    for i, (_, row) in enumerate(best_winrate.iterrows()):
-        print(f"   {i+1}. Pattern {row['pattern_id']} ({row['pattern_name'][:30]}): {row['win_rate_pct']:.1f}%")
+    for i, (pattern_id, pattern_name, value) in enumerate(zip(best_winrate['pattern_id'], best_winrate['pattern_name'], best_winrate['win_rate_pct'])):
+        print(f"   {i+1}. Pattern {pattern_id} ({pattern_name[:30]}): {value:.1f}%")
     
     # Key Insights
     print("\n💡 KEY INSIGHTS")
@@ -119,14 +149,14 @@ def display_pattern_metrics():
     high_drawdown = df[df['max_drawdown_pct'] < -3]
     if len(high_drawdown) > 0:
         print("🚨 High Drawdown Patterns (>3%):")
-        for _, row in high_drawdown.iterrows():
-            print(f"   - Pattern {row['pattern_id']}: {row['max_drawdown_pct']:.2f}% max drawdown")
+        for pattern_id, value in zip(high_drawdown['pattern_id'], high_drawdown['max_drawdown_pct']):
+            print(f"   - Pattern {pattern_id}: {value:.2f}% max drawdown")
     
     negative_sharpe = df[df['sharpe_ratio'] < 0]
     if len(negative_sharpe) > 0:
         print("⚠️ Negative Sharpe Ratios:")
-        for _, row in negative_sharpe.iterrows():
-            print(f"   - Pattern {row['pattern_id']}: {row['sharpe_ratio']:.3f} Sharpe ratio")
+        for pattern_id, value in zip(negative_sharpe['pattern_id'], negative_sharpe['sharpe_ratio']):
+            print(f"   - Pattern {pattern_id}: {value:.3f} Sharpe ratio")
     
     print("\n📁 Detailed data available in:")
     print("   - pattern_wise_metrics.csv (complete metrics)")
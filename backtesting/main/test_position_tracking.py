@@ -16,7 +16,7 @@ def create_test_signals():
     
     # Create test signals - some consecutive
     pattern_0_signals = [0, 1, 1, 0, 0, -1, -1, 0, 0, 1, 1, 1, 0, 0, 0, -1, 0, 0, 1, 0]
-    close_prices = [100 + i*0.5 + np.random.normal(0, 0.2) for i in range(20)]
+    close_prices = 100 + np.arange(20) * 0.5 + np.random.normal(0, 0.2, size=20)
     
     data = {
         'datetime': dates,
@@ -55,11 +55,10 @@ def analyze_position_tracking():
     trades_taken = []
     signals_skipped = []
     
-    for idx, row in df.iterrows():
-        signal_time = row['datetime']
-        signal_type = row['pattern_0']
-        close_price = row['close']
-        
+    # Walk the columns as NumPy arrays, no per-row Series
+    for signal_time, signal_type, close_price in zip(
+        df['datetime'], df['pattern_0'].to_numpy(), df['close'].to_numpy()
+    ):
         action = "No Signal"
         
         if signal_type != 0:
@@ -8,15 +8,17 @@ import os
 import sys
 import pandas as pd
 import numpy as np
-import clickhouse_connect
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import dotenv
 
 # Add the current directory to Python path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append('..')
+# The backtester, its config and kernels live in main/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main'))
 
 # Import resample function
 try:
@@ -32,7 +34,7 @@ except ImportError:
             'closest_expiry': 'first'
         }).dropna()
 
-from backtesting import IchimokuADXBacktester, run_complete_backtest
+from backtesting import IchimokuADXBacktester, run_complete_backtest, get_clickhouse_client, read_signals_csv, write_csv
 
 
 def ichimoku(df, tenkan=9, kijun=26, senkou_b=52):
@@ -104,7 +106,7 @@ def generate_signals(df):
     signals = {}
     # helper to encode
     def enc(cond_buy, cond_sell):
-        sig = np.zeros(len(df), dtype=int)
+        sig = np.zeros(len(df), dtype=np.int8)
         sig[cond_buy]  =  1
         sig[cond_sell] = -1
         return sig
@@ -209,19 +211,23 @@ def generate_signals(df):
         (chikou_ahead < A) & (A < B) & (adx >= 25),
     )
 
-    # attach to df
-    for name, sig in signals.items():
-        df[name] = sig
+    # Net signed vote across all patterns, stored once so readers don't re-sum the pattern block
+    signals['total_signal'] = np.stack(list(signals.values())).sum(axis=0, dtype=np.int8)
+
+    # attach to df in one go so the pattern columns share a single int8 block
+    df = pd.concat([df, pd.DataFrame(signals, index=df.index)], axis=1)
 
     return df
 
 
-def fetch_data_from_clickhouse(time_interval=15):
+def fetch_data_from_clickhouse(time_interval=15, symbol='NIFTY', start_year=2021):
     """
     Fetch data from ClickHouse and generate signals
     
     Args:
         time_interval: Time interval in minutes for resampling
+        symbol: Underlying symbol to fetch
+        start_year: First year of spot data to include
     """
     # Load environment variables
     dotenv.load_dotenv()
@@ -232,14 +238,11 @@ def fetch_data_from_clickhouse(time_interval=15):
     clickhouse_user = os.getenv("CLICKHOUSE_USER")
     clickhouse_password = os.getenv("CLICKHOUSE_PASSWORD")
 
-    client = clickhouse_connect.get_client(
-        host=clickhouse_host,
-        port=clickhouse_port,
-        username=clickhouse_user,
-        password=clickhouse_password
-    )
+    client = get_clickhouse_client(clickhouse_host, clickhouse_port, clickhouse_user, clickhouse_password)
 
     # SQL query to get spot data with closest expiry date
+    # ASOF JOIN picks the nearest expiry on or after each trading day on the server,
+    # instead of pairing every minute with every expiry and reducing with argMin
     query = """
     SELECT 
         s.datetime,
@@ -247,29 +250,35 @@ def fetch_data_from_clickhouse(time_interval=15):
         s.high,
         s.low,
         s.close,
-        argMin(opt.expiry_date, dateDiff('day', toDate(s.datetime), opt.expiry_date)) AS closest_expiry
-    FROM minute_data.spot AS s
-    CROSS JOIN 
+        opt.expiry_date AS closest_expiry
+    FROM 
+    (
+        SELECT datetime, open, high, low, close, underlying_symbol,
+               toDate(datetime) AS trade_date
+        FROM minute_data.spot
+        WHERE underlying_symbol = {symbol:String}
+          AND toYear(datetime) >= {start_year:UInt16}
+    ) AS s
+    ASOF JOIN 
     (
-        SELECT DISTINCT expiry_date 
+        SELECT DISTINCT underlying_symbol, expiry_date 
         FROM minute_data.options
-        WHERE underlying_symbol = 'NIFTY'
+        WHERE underlying_symbol = {symbol:String}
     ) AS opt
-    WHERE s.underlying_symbol = 'NIFTY'
-      AND opt.expiry_date >= toDate(s.datetime) 
-        AND toYear(s.datetime) >= 2021
-        
-    GROUP BY 
-        s.datetime,
-        s.open,
-        s.high,
-        s.low,
-        s.close
+    ON s.underlying_symbol = opt.underlying_symbol
+       AND s.trade_date <= opt.expiry_date
     ORDER BY s.datetime
     """
 
-    # Execute the query and get a DataFrame
-    df = client.query_df(query)
+    # Server-side bindings instead of literals baked into the query text
+    parameters = {'symbol': symbol, 'start_year': start_year}
+
+    # Stream the result block by block and build the DataFrame with a single concat
+    with client.query_df_stream(query, parameters=parameters) as stream:
+        blocks = list(stream)
+    if not blocks:
+        raise ValueError("No spot data returned from ClickHouse")
+    df = pd.concat(blocks, ignore_index=True)
     
     # Resample the data
     df = resample(df, f'{time_interval}T')
@@ -362,6 +371,26 @@ def display_signal_summary(df_signals):
     print("📖 See comprehensive documentation: docs/ichimoku_adx_algorithm_guide.md")
 
 
+def _run_one(signals_file: str, params: Dict) -> Dict:
+    """
+    Run one backtest scenario in a worker process
+    Only the scenario name, parameters and metrics are returned; the backtester stays in the worker
+    """
+    params = dict(params)
+    scenario_name = params.pop('scenario_name')
+    try:
+        _, metrics = run_complete_backtest(signals_file=signals_file, **params)
+    except Exception as e:
+        print(f"Error running backtest scenario '{scenario_name}': {e}")
+        return {'error': str(e)}
+    
+    return {
+        'scenario_name': scenario_name,
+        'parameters': params,
+        'metrics': metrics
+    }
+
+
 class SignalGenerator:
     """
     Signal generator and backtesting orchestrator for Ichimoku-ADX-Wilder strategy
@@ -395,6 +424,7 @@ class SignalGenerator:
         try:
             # Fetch data and generate signals
             self.signals_df = fetch_data_from_clickhouse(self.time_interval)
+            self._index_signals()
             
             # Test signal generation
             test_signal_generation(self.signals_df)
@@ -412,7 +442,7 @@ class SignalGenerator:
             # Ensure directory exists
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
             
-            self.signals_df.to_csv(output_file, index=False)
+            write_csv(self.signals_df, output_file)
             print(f"\n✅ Signals saved to: {output_file}")
             
             # Update the file path
@@ -427,8 +457,10 @@ class SignalGenerator:
     def load_signals(self):
         """Load and validate the signals data"""
         try:
-            self.signals_df = pd.read_csv(self.signals_file_path)
-            self.signals_df['datetime'] = pd.to_datetime(self.signals_df['datetime'])
+            pattern_dtypes = {f'pattern_{i}': np.int8 for i in range(10)}
+            pattern_dtypes['total_signal'] = np.int8
+            self.signals_df = read_signals_csv(self.signals_file_path, pattern_dtypes)
+            self._index_signals()
             print(f"Loaded {len(self.signals_df)} signal records from {self.signals_file_path}")
             
             # Display signal summary
@@ -438,6 +470,21 @@ class SignalGenerator:
             print(f"Error loading signals: {e}")
             raise
     
+    def _index_signals(self):
+        """
+        Put signals_df in time order, so date ranges are sliced with searchsorted, and cache its
+        pattern columns as one contiguous int8 (rows, patterns) array plus the net signed signal
+        per row (the stored total_signal column when the CSV has it)
+        """
+        if not self.signals_df['datetime'].is_monotonic_increasing:
+            self.signals_df = self.signals_df.sort_values('datetime', kind='stable', ignore_index=True)
+        self._pattern_cols = [col for col in self.signals_df.columns if col.startswith('pattern_')]
+        self._pattern_codes = np.ascontiguousarray(self.signals_df[self._pattern_cols].to_numpy(dtype=np.int8))
+        if 'total_signal' in self.signals_df.columns:
+            self._total_signals = self.signals_df['total_signal'].to_numpy(dtype=np.int8)
+        else:
+            self._total_signals = self._pattern_codes.sum(axis=1, dtype=np.int8)
+    
     def display_signal_summary(self):
         """Display a summary of the loaded signals"""
         if self.signals_df is None:
@@ -455,15 +502,11 @@ class SignalGenerator:
         print(f"Total Records: {len(self.signals_df)}")
         
         # Pattern analysis
-        pattern_cols = [col for col in self.signals_df.columns if col.startswith('pattern_')]
-        if pattern_cols:
-            print(f"Signal Patterns Available: {len(pattern_cols)}")
+        if self._pattern_cols:
+            print(f"Signal Patterns Available: {len(self._pattern_cols)}")
             
             # Calculate total signals per pattern
-            pattern_summary = {}
-            for col in pattern_cols:
-                non_zero = (self.signals_df[col] != 0).sum()
-                pattern_summary[col] = non_zero
+            pattern_summary = dict(zip(self._pattern_cols, np.count_nonzero(self._pattern_codes, axis=0)))
             
             print("\nPattern Activity:")
             for pattern, count in pattern_summary.items():
@@ -476,8 +519,10 @@ class SignalGenerator:
         
         if available_indicators:
             print(f"\nTechnical Indicators Available: {len(available_indicators)}")
-            for indicator in available_indicators:
-                non_null = self.signals_df[indicator].notna().sum()
+            # Coverage of every indicator from one NaN count over the indicator block
+            indicator_values = self.signals_df[available_indicators].to_numpy(dtype=np.float64)
+            non_null_counts = indicator_values.shape[0] - np.count_nonzero(np.isnan(indicator_values), axis=0)
+            for indicator, non_null in zip(available_indicators, non_null_counts):
                 percentage = (non_null / len(self.signals_df)) * 100
                 print(f"  {indicator}: {non_null} values ({percentage:.1f}% coverage)")
     
@@ -486,11 +531,18 @@ class SignalGenerator:
         if self.signals_df is None:
             return None, None
         
-        start_date = self.signals_df['datetime'].min().strftime('%Y-%m-%d')
-        end_date = self.signals_df['datetime'].max().strftime('%Y-%m-%d')
+        start_date = self.signals_df['datetime'].iloc[0].strftime('%Y-%m-%d')
+        end_date = self.signals_df['datetime'].iloc[-1].strftime('%Y-%m-%d')
         
         return start_date, end_date
     
+    def _signal_rows(self, start_date, end_date=None) -> Tuple[int, int]:
+        """Row positions [first, last) of the time-ordered signals between start_date and end_date inclusive"""
+        signal_times = self.signals_df['datetime']
+        first = int(signal_times.searchsorted(pd.Timestamp(start_date), side='left'))
+        last = len(signal_times) if end_date is None else int(signal_times.searchsorted(pd.Timestamp(end_date), side='right'))
+        return first, max(first, last)
+    
     def filter_signals_by_date(self, start_date: str, end_date: str) -> int:
         """
         Filter signals by date range and return count of filtered signals
@@ -505,8 +557,8 @@ class SignalGenerator:
         if self.signals_df is None:
             return 0
         
-        mask = (self.signals_df['datetime'] >= start_date) & (self.signals_df['datetime'] <= end_date)
-        filtered_count = mask.sum()
+        first, last = self._signal_rows(start_date, end_date)
+        filtered_count = last - first
         
         print(f"Signals in date range {start_date} to {end_date}: {filtered_count}")
         return filtered_count
@@ -519,22 +571,20 @@ class SignalGenerator:
         analysis = {}
         
         # Pattern analysis
-        pattern_cols = [col for col in self.signals_df.columns if col.startswith('pattern_')]
-        
-        if pattern_cols:
-            # Calculate signal strength distribution
-            total_signals = self.signals_df[pattern_cols].sum(axis=1)
-            signal_strength_dist = total_signals.value_counts().sort_index()
+        if self._pattern_cols and self._total_signals.shape[0] > 0:
+            # Calculate signal strength distribution; np.unique returns the strengths sorted
+            total_signals = self._total_signals
+            strengths, counts = np.unique(total_signals, return_counts=True)
             
-            analysis['signal_strength_distribution'] = signal_strength_dist.to_dict()
-            analysis['max_signal_strength'] = total_signals.max()
-            analysis['min_signal_strength'] = total_signals.min()
-            analysis['avg_signal_strength'] = total_signals.mean()
+            analysis['signal_strength_distribution'] = dict(zip(strengths.tolist(), counts.tolist()))
+            analysis['max_signal_strength'] = strengths[-1]
+            analysis['min_signal_strength'] = strengths[0]
+            analysis['avg_signal_strength'] = total_signals.mean(dtype=np.float64)
             
             # Signal frequency
-            analysis['total_buy_signals'] = (total_signals > 0).sum()
-            analysis['total_sell_signals'] = (total_signals < 0).sum()
-            analysis['total_neutral'] = (total_signals == 0).sum()
+            analysis['total_buy_signals'] = int(counts[strengths > 0].sum())
+            analysis['total_sell_signals'] = int(counts[strengths < 0].sum())
+            analysis['total_neutral'] = int(counts[strengths == 0].sum())
         
         # ADX analysis
         if 'adx' in self.signals_df.columns:
@@ -585,13 +635,15 @@ class SignalGenerator:
         
         try:
             # Run the backtest
+            # The loaded signals are passed in, so scenarios do not re-read the CSV
             backtester, metrics = run_complete_backtest(
                 signals_file=self.signals_file_path,
                 symbol=symbol,
                 start_date=start_date,
                 end_date=end_date,
                 initial_capital=initial_capital,
-                position_size=position_size
+                position_size=position_size,
+                signals_df=self.signals_df
             )
             
             scenario_results = {
@@ -614,9 +666,15 @@ class SignalGenerator:
             return {'error': str(e)}
     
     def run_multiple_scenarios(self) -> List[Dict]:
-        """Run multiple backtesting scenarios with different parameters"""
+        """
+        Run multiple backtesting scenarios with different parameters
+        Scenarios run in parallel worker processes; results keep the listed order
+        """
         scenarios = []
         
+        if self.signals_file_path is None:
+            raise ValueError("No signals file available. Generate signals first.")
+        
         # Get available date range
         start_date, end_date = self.get_date_range()
         
@@ -624,41 +682,23 @@ class SignalGenerator:
             print("Cannot determine date range from signals")
             return scenarios
         
-        # Scenario 1: Full period with standard parameters
-        scenarios.append(self.run_backtest_scenario(
-            scenario_name="Full Period - Standard",
-            start_date=start_date,
-            end_date=end_date,
-            initial_capital=100000,
-            position_size=0.1
-        ))
-        
-        # Scenario 2: Full period with aggressive position sizing
-        scenarios.append(self.run_backtest_scenario(
-            scenario_name="Full Period - Aggressive",
-            start_date=start_date,
-            end_date=end_date,
-            initial_capital=100000,
-            position_size=0.2
-        ))
+        scenario_params = [
+            # Full period with standard, aggressive and conservative position sizing
+            dict(scenario_name="Full Period - Standard", initial_capital=100000, position_size=0.1),
+            dict(scenario_name="Full Period - Aggressive", initial_capital=100000, position_size=0.2),
+            dict(scenario_name="Full Period - Conservative", initial_capital=100000, position_size=0.05),
+            # Higher capital
+            dict(scenario_name="High Capital - Standard", initial_capital=500000, position_size=0.1),
+        ]
+        for params in scenario_params:
+            params.update(start_date=start_date, end_date=end_date, symbol='NIFTY')
         
-        # Scenario 3: Full period with conservative position sizing
-        scenarios.append(self.run_backtest_scenario(
-            scenario_name="Full Period - Conservative",
-            start_date=start_date,
-            end_date=end_date,
-            initial_capital=100000,
-            position_size=0.05
-        ))
+        print(f"\nRunning {len(scenario_params)} backtest scenarios from {start_date} to {end_date}")
         
-        # Scenario 4: Higher capital
-        scenarios.append(self.run_backtest_scenario(
-            scenario_name="High Capital - Standard",
-            start_date=start_date,
-            end_date=end_date,
-            initial_capital=500000,
-            position_size=0.1
-        ))
+        # Each worker reads the signals itself (from the Parquet sidecar once load_signals has written it)
+        # and returns only picklable metrics
+        with ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as executor:
+            scenarios = list(executor.map(_run_one, [self.signals_file_path] * len(scenario_params), scenario_params))
         
         return scenarios
     
@@ -704,7 +744,7 @@ class SignalGenerator:
             
             # Save comparison
             os.makedirs('./results/', exist_ok=True)
-            comparison_df.to_csv('./results/scenario_comparison.csv', index=False)
+            write_csv(comparison_df, './results/scenario_comparison.csv')
             print(f"\nScenario comparison saved to ./results/scenario_comparison.csv")
     
     def generate_trading_signals_for_live(self, lookback_days: int = 30) -> pd.DataFrame:
@@ -721,18 +761,17 @@ class SignalGenerator:
             return pd.DataFrame()
         
         # Get recent signals
-        end_date = self.signals_df['datetime'].max()
+        end_date = self.signals_df['datetime'].iloc[-1]
         start_date = end_date - timedelta(days=lookback_days)
         
-        recent_signals = self.signals_df[
-            self.signals_df['datetime'] >= start_date
-        ].copy()
+        first, _ = self._signal_rows(start_date)
+        recent_signals = self.signals_df.iloc[first:].copy()
         
         # Process signals for live trading
-        pattern_cols = [col for col in recent_signals.columns if col.startswith('pattern_')]
-        recent_signals['total_signal'] = recent_signals[pattern_cols].sum(axis=1)
-        recent_signals['signal_type'] = recent_signals['total_signal'].apply(
-            lambda x: 'BUY' if x > 0 else ('SELL' if x < 0 else 'HOLD')
+        recent_signals['total_signal'] = self._total_signals[first:]
+        # The sign of the net signal (-1/0/+1) shifted by one is the category code
+        recent_signals['signal_type'] = pd.Categorical.from_codes(
+            np.sign(recent_signals['total_signal'].to_numpy()) + 1, categories=['SELL', 'HOLD', 'BUY']
         )
         
         # Filter only actionable signals
@@ -820,7 +859,7 @@ def main():
             
             # Save recent signals
             os.makedirs('./results/', exist_ok=True)
-            recent_signals.to_csv('./results/recent_signals.csv', index=False)
+            write_csv(recent_signals, './results/recent_signals.csv')
             print("Recent signals saved to ./results/recent_signals.csv")
         
         print("\n" + "="*60)